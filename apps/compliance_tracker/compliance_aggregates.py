@@ -0,0 +1,51 @@
+"""
+Dashboard aggregates for the compliance tracker.
+
+Record counts keyed by status, by (store, status) and by (region, status),
+built in one pass over (store_id, status, count) rows or updated one record
+at a time with add(). Every dashboard number is then a dict lookup.
+"""
+from collections import Counter, defaultdict
+
+
+class ComplianceAggregates:
+    def __init__(self, stores: list):
+        self.region_of = {s["id"]: s.get("region") for s in stores}
+        self.total = Counter()                 # status -> count
+        self.by_store = defaultdict(Counter)   # store_id -> status -> count
+        self.by_region = defaultdict(Counter)  # region -> status -> count
+
+    @classmethod
+    def from_counts(cls, stores: list, counts) -> "ComplianceAggregates":
+        """Build from (store_id, status, count) rows, e.g. a GROUP BY result."""
+        aggregates = cls(stores)
+        for store_id, status, n in counts:
+            aggregates.add(store_id, status, n)
+        return aggregates
+
+    @classmethod
+    def from_records(cls, stores: list, records: list) -> "ComplianceAggregates":
+        aggregates = cls(stores)
+        for record in records:
+            aggregates.add(record["store_id"], record["status"])
+        return aggregates
+
+    def add(self, store_id, status: str, n: int = 1) -> None:
+        """Count n more records (negative n to remove)."""
+        self.total[status] += n
+        self.by_store[store_id][status] += n
+        self.by_region[self.region_of.get(store_id)][status] += n
+
+    def _counter(self, region: str = None) -> Counter:
+        if region is None or region == "All":
+            return self.total
+        return self.by_region.get(region, Counter())
+
+    def count(self, status: str = None, region: str = None) -> int:
+        """Records with status (all statuses if None), optionally in one region."""
+        counter = self._counter(region)
+        return sum(counter.values()) if status is None else counter.get(status, 0)
+
+    def store(self, store_id) -> Counter:
+        """status -> count for one store (empty if it has no records)."""
+        return self.by_store.get(store_id, Counter())
@@ -0,0 +1,179 @@
+"""
+Read-only JSON API over the compliance tracker's storage.
+
+Serves the same data as the Streamlit page without rendering it: stores,
+records (filtered and paged), due-soon lists and dashboard aggregates.
+Every response carries an ETag derived from storage.version(), so a client
+that sends it back in If-None-Match gets an empty 304 until the data
+changes; answers are memoised per version by CachedStorage.
+
+    uvicorn compliance_api:app --port 8001
+"""
+import hashlib
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from compliance_store import RECORD_FIELDS, CachedStorage, open_storage
+
+# Same data directory and backend (COMPLIANCE_BACKEND) as the Streamlit app.
+# Configure with COMPLIANCE_DATA_DIR.
+storage = CachedStorage(open_storage(os.environ.get("COMPLIANCE_DATA_DIR", "/tmp/compliance_data")))
+
+app = FastAPI(title="Compliance Tracker API", version="0.1.0")
+
+MAX_PAGE_SIZE = 1000
+
+# Clients may keep a response but must revalidate it before reuse
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(version: str, *extra) -> str:
+    """Weak ETag for a data version, plus anything else the body depends on."""
+    digest = hashlib.sha1("|".join(map(str, (version,) + extra)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check, weak comparison (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def conditional(request: Request, compute, *extra) -> Response:
+    """
+    304 if the client already has this version, otherwise compute()'s JSON.
+    The version is read before computing, so a write in between only makes
+    the ETag older than the body and the client refetches next time.
+    """
+    etag = make_etag(storage.version(), *extra)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(compute(), headers=headers)
+
+
+def store_ids_for(region: Optional[str], store_id: Optional[int]) -> Optional[list]:
+    """The store filter for a region and/or store, None for all stores."""
+    if region is None and store_id is None:
+        return None
+    return [
+        s["id"] for s in storage.stores()
+        if (region is None or s["region"] == region) and (store_id is None or s["id"] == store_id)
+    ]
+
+
+@app.get("/")
+def health_check():
+    return {"status": "API is running", "version": storage.version()}
+
+
+@app.get("/stores")
+def list_stores(request: Request, region: Optional[str] = None):
+    def compute():
+        aggregates = storage.aggregates()
+        return [
+            {**s, "status_counts": dict(aggregates.store(s["id"]))}
+            for s in storage.stores() if region is None or s["region"] == region
+        ]
+    return conditional(request, compute)
+
+
+@app.get("/stores/{store_id}")
+def get_store(request: Request, store_id: int):
+    store = next((s for s in storage.stores() if s["id"] == store_id), None)
+    if store is None:
+        raise HTTPException(status_code=404, detail=f"Store {store_id} not found")
+    return conditional(request, lambda: {**store, "status_counts": dict(storage.aggregates().store(store_id))})
+
+
+@app.get("/records")
+def list_records(
+    request: Request,
+    store_id: Optional[int] = None,
+    region: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    order_by: str = "id",
+    descending: bool = False,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """One page of matching records plus the total match count."""
+    # Checked before the ETag, so a bad request never gets a 304
+    if order_by not in RECORD_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{order_by}' (use one of {RECORD_FIELDS})")
+    filters = {
+        "store_ids": store_ids_for(region, store_id),
+        "status": status,
+        "category": category,
+        "due_from": due_from.isoformat() if due_from else None,
+        "due_to": due_to.isoformat() if due_to else None,
+    }
+
+    def compute():
+        records = storage.records(order_by=order_by, descending=descending, limit=limit, offset=offset, **filters)
+        return {"total": storage.count(**filters), "limit": limit, "offset": offset, "records": records}
+    return conditional(request, compute)
+
+
+@app.get("/due-soon")
+def due_soon(
+    request: Request,
+    days: int = Query(30, ge=0, le=366),
+    store_id: Optional[int] = None,
+    region: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Records due in the next `days` days, soonest first, with due and overdue counts."""
+    scopes = [("store", store_id), ("region", region), ("category", category)]
+    scopes = [scope for scope in scopes if scope[1] is not None]
+    if len(scopes) > 1:
+        raise HTTPException(status_code=400, detail="Filter by one of store_id, region or category")
+    scope = scopes[0] if scopes else None
+    # The answer moves with the calendar as well as with the data
+    today = date.today()
+
+    def compute():
+        due_index = storage.due_index()
+        due_count = len(due_index.due_within(days, today=today, scope=scope))
+        records = storage.records(
+            store_ids=store_ids_for(region, store_id), category=category,
+            due_from=today.isoformat(), due_to=(today + timedelta(days=days)).isoformat(),
+            order_by="next_due", limit=limit,
+        ) if due_count else []
+        return {
+            "today": today.isoformat(),
+            "days": days,
+            "due": due_count,
+            "overdue": due_index.overdue(today=today, scope=scope),
+            "records": records,
+        }
+    return conditional(request, compute, today)
+
+
+@app.get("/aggregates")
+def aggregates(request: Request):
+    """Record counts by status, overall, per region and per store."""
+    def compute():
+        counts = storage.aggregates()
+        return {
+            "total": dict(counts.total),
+            "by_region": {region: dict(c) for region, c in counts.by_region.items() if region is not None},
+            "by_store": {str(store_id): dict(c) for store_id, c in counts.by_store.items()},
+        }
+    return conditional(request, compute)
@@ -0,0 +1,62 @@
+"""
+Due-date index for compliance records.
+
+Keeps record ids sorted by next_due, once for all records and once per
+store, region and category, so "what is due between these dates" is two
+bisects plus the matches, and a 52-week forecast is 53 bisects.
+Dates are ISO strings (YYYY-MM-DD), which sort the same as the dates.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+
+
+class DueDateIndex:
+    def __init__(self, stores: list, entries):
+        """
+        Args:
+            stores: store dicts, for the region of each store
+            entries: (next_due, record_id, store_id, category) rows
+        """
+        region_of = {s["id"]: s.get("region") for s in stores}
+        # scope -> ([due dates], [record ids]), both in due-date order.
+        # Scopes: None (all), ("store", id), ("region", name), ("category", name)
+        self._postings = defaultdict(lambda: ([], []))
+        for due, record_id, store_id, category in sorted(tuple(e) for e in entries if e[0]):
+            for scope in (None, ("store", store_id), ("region", region_of.get(store_id)), ("category", category)):
+                dates, ids = self._postings[scope]
+                dates.append(due)
+                ids.append(record_id)
+
+    def _range(self, start: str = None, end: str = None, scope: tuple = None) -> tuple:
+        dates, ids = self._postings.get(scope, ([], []))
+        lo = bisect_left(dates, start) if start is not None else 0
+        hi = bisect_right(dates, end) if end is not None else len(dates)
+        return dates, ids, lo, hi
+
+    def due_between(self, start: str = None, end: str = None, scope: tuple = None) -> list:
+        """Record ids due from start to end (inclusive, either open), soonest first."""
+        _, ids, lo, hi = self._range(start, end, scope)
+        return ids[lo:hi]
+
+    def count_between(self, start: str = None, end: str = None, scope: tuple = None) -> int:
+        _, _, lo, hi = self._range(start, end, scope)
+        return max(hi - lo, 0)
+
+    def due_within(self, days: int, today: date = None, scope: tuple = None) -> list:
+        """Record ids due in the next `days` days, today included."""
+        today = today or date.today()
+        return self.due_between(today.isoformat(), (today + timedelta(days=days)).isoformat(), scope)
+
+    def overdue(self, today: date = None, scope: tuple = None) -> int:
+        """Records whose next_due is before today."""
+        today = today or date.today()
+        return self.count_between(end=(today - timedelta(days=1)).isoformat(), scope=scope)
+
+    def weekly_forecast(self, start: date = None, weeks: int = 52, scope: tuple = None) -> list:
+        """[(week start, records due that week)] for `weeks` weeks from start's Monday."""
+        start = start or date.today()
+        monday = start - timedelta(days=start.weekday())
+        dates = self._postings.get(scope, ([], []))[0]
+        bounds = [bisect_left(dates, (monday + timedelta(weeks=i)).isoformat()) for i in range(weeks + 1)]
+        return [(monday + timedelta(weeks=i), bounds[i + 1] - bounds[i]) for i in range(weeks)]
@@ -0,0 +1,79 @@
+"""
+Chunked report export to CSV, gzip-compressed CSV or Parquet.
+
+Rows arrive as an iterable of lists of dicts (one list per chunk) and are
+written to a file one chunk at a time, so memory is bounded by the chunk
+size rather than the report size. Parquet needs pyarrow (optional).
+"""
+import csv
+import gzip
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats() -> list:
+    return [fmt for fmt in FORMATS if fmt != "Parquet" or pq is not None]
+
+
+def _write_csv(f, chunks, columns: list, progress) -> int:
+    writer = csv.writer(f)
+    writer.writerow([header for _, header in columns])
+    written = 0
+    for chunk in chunks:
+        writer.writerows([row.get(field) for field, _ in columns] for row in chunk)
+        written += len(chunk)
+        progress(written)
+    return written
+
+
+def _write_parquet(path: str, chunks, columns: list, progress) -> int:
+    # Every column is exported as text so chunks never disagree on types
+    schema = pa.schema([(header, pa.string()) for _, header in columns])
+    written = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            arrays = [
+                pa.array([None if row.get(field) is None else str(row.get(field)) for row in chunk], pa.string())
+                for field, _ in columns
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(chunk)
+            progress(written)
+    return written
+
+
+def export_chunks(chunks, columns: list, fmt: str, path: str, progress=None) -> int:
+    """
+    Write chunks of row dicts to path.
+
+    Args:
+        chunks: iterable of lists of dicts
+        columns: [(field, header)] in output order
+        fmt: one of FORMATS
+        progress: optional callback(rows written so far), called per chunk
+    Returns: rows written
+    """
+    progress = progress or (lambda written: None)
+    if fmt == "CSV":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            return _write_csv(f, chunks, columns, progress)
+    if fmt == "CSV (gzip)":
+        with gzip.open(path, "wt", newline="", encoding="utf-8") as f:
+            return _write_csv(f, chunks, columns, progress)
+    if fmt == "Parquet":
+        if pq is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        return _write_parquet(path, chunks, columns, progress)
+    raise ValueError(f"Unknown export format '{fmt}'")
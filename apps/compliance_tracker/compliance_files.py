@@ -0,0 +1,72 @@
+"""
+File helpers shared by this tracker and the archive tracker in
+playground/archive_frontend, which imports them from here.
+
+    write_json_atomic  replace a JSON file in one step
+    import_rows        validate CSV rows and save them in batches
+"""
+import csv
+import json
+import os
+import stat
+import uuid
+
+MAX_ERRORS = 1000  # import errors kept for the report; all of them are counted
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Replace path with data in one step; the old file stays intact on failure."""
+    tmp_path = os.path.join(os.path.dirname(os.path.abspath(path)), f".tmp_{uuid.uuid4().hex}.json")
+    # Created like a plain open() would (0666 less the umask), not mkstemp's 0600
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "w") as f:
+            if os.path.exists(path):
+                # Replacing a file keeps its permissions
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+            json.dump(data, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def import_rows(f, validate, write, batch_size: int, progress=None) -> dict:
+    """
+    Read an open CSV text file one row at a time and save the rows that
+    validate(row) accepts with write(batch) -> rows saved, batch_size at a
+    time. Rows validate rejects (ValueError) are reported with their line
+    number instead of stopping the import.
+
+    Args:
+        progress: optional callback(rows read so far), called per batch
+    Returns: {"imported": n, "failed": n, "errors": [(line, message)]}
+    """
+    progress = progress or (lambda rows: None)
+    result = {"imported": 0, "failed": 0, "errors": []}
+    batch = []
+    reader = csv.DictReader(f)
+    try:
+        for rows, row in enumerate(reader, start=1):
+            line = reader.line_num  # file line, counting blank lines and quoted newlines
+            try:
+                batch.append(validate(row))
+            except ValueError as e:
+                result["failed"] += 1
+                if len(result["errors"]) < MAX_ERRORS:
+                    result["errors"].append((line, str(e)))
+            if len(batch) >= batch_size:
+                result["imported"] += write(batch)
+                batch = []
+                progress(rows)
+    except UnicodeDecodeError:
+        # Nothing after an undecodable byte can be trusted; keep the rows before it
+        result["failed"] += 1
+        result["errors"].append((reader.line_num + 1, "file is not UTF-8 text; import stopped near this line"))
+    if batch:
+        result["imported"] += write(batch)
+    progress(result["imported"] + result["failed"])
+    return result
@@ -0,0 +1,125 @@
+"""
+Bulk CSV import of stores and compliance records.
+
+The CSV is read one row at a time; valid rows are written in batches of
+batch_size, each batch in one storage transaction, and invalid rows are
+reported with their line number instead of stopping the import.
+
+Columns (header row required, extra columns ignored):
+    stores   name*, region, manager
+    records  store_id* (or store* by name), category*, status*,
+             last_audit, next_due (YYYY-MM-DD), reviewer, notes
+
+    python compliance_import.py records inspections.csv [--data-dir /tmp/compliance_data]
+"""
+import argparse
+import time
+from datetime import date
+
+from compliance_files import import_rows
+from compliance_store import open_storage
+
+STATUSES = ["Compliant", "Pending Review", "Action Required"]
+BATCH_SIZE = 5000
+
+
+def _date(row: dict, field: str):
+    value = (row.get(field) or "").strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"{field} '{value}' is not a YYYY-MM-DD date")
+
+
+def store_validator():
+    def validate(row: dict) -> dict:
+        name = (row.get("name") or "").strip()
+        if not name:
+            raise ValueError("name is required")
+        return {"name": name, "region": (row.get("region") or "").strip(), "manager": (row.get("manager") or "").strip()}
+    return validate
+
+
+def record_validator(stores: list, categories: list = None):
+    """categories: allowed names, or None to accept any."""
+    store_ids = {s["id"] for s in stores}
+    names = {}
+    for s in stores:
+        names.setdefault(s["name"], []).append(s["id"])
+
+    def validate(row: dict) -> dict:
+        store_id = (row.get("store_id") or "").strip()
+        if store_id:
+            if not store_id.isdigit() or int(store_id) not in store_ids:
+                raise ValueError(f"unknown store_id '{store_id}'")
+            store_id = int(store_id)
+        elif (row.get("store") or "").strip():
+            name = row["store"].strip()
+            matches = names.get(name, [])
+            if len(matches) != 1:
+                raise ValueError(f"store '{name}' " + ("matches several stores" if matches else "not found"))
+            store_id = matches[0]
+        else:
+            raise ValueError("store_id or store is required")
+        category = (row.get("category") or "").strip()
+        if not category or (categories is not None and category not in categories):
+            raise ValueError(f"unknown category '{category}'")
+        status = (row.get("status") or "").strip()
+        if status not in STATUSES:
+            raise ValueError(f"status '{status}' is not one of {', '.join(STATUSES)}")
+        return {
+            "store_id": store_id,
+            "category": category,
+            "status": status,
+            "last_audit": _date(row, "last_audit"),
+            "next_due": _date(row, "next_due"),
+            "reviewer": (row.get("reviewer") or "").strip(),
+            "notes": (row.get("notes") or "").strip(),
+        }
+    return validate
+
+
+def import_csv(storage, kind: str, f, categories: list = None, batch_size: int = BATCH_SIZE,
+               user: str = None, progress=None) -> dict:
+    """
+    Import stores or records from an open text file.
+
+    Args:
+        kind: "stores" or "records"
+        progress: optional callback(rows read so far), called per batch
+    Returns: {"imported": n, "failed": n, "errors": [(line, message)]}
+    """
+    if kind == "stores":
+        validate, write = store_validator(), storage.add_stores
+    elif kind == "records":
+        validate, write = record_validator(storage.stores(), categories), storage.add_records
+    else:
+        raise ValueError(f"Unknown import kind '{kind}' (use stores or records)")
+    return import_rows(f, validate, lambda batch: write(batch, user=user), batch_size, progress)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import stores or compliance records from CSV.")
+    parser.add_argument("kind", choices=["stores", "records"])
+    parser.add_argument("csv_file")
+    parser.add_argument("--data-dir", default="/tmp/compliance_data")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--user", default="csv import")
+    args = parser.parse_args()
+
+    storage = open_storage(args.data_dir)
+    start = time.perf_counter()
+    with open(args.csv_file, newline="", encoding="utf-8-sig") as f:
+        result = import_csv(storage, args.kind, f, batch_size=args.batch_size, user=args.user,
+                            progress=lambda rows: print(f"  {rows:,} rows read", end="\r"))
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"✅ Imported {result['imported']:,} {args.kind} in {elapsed:.1f}s; {result['failed']:,} rows rejected")
+    for line, message in result["errors"]:
+        print(f"  line {line}: {message}")
+
+
+if __name__ == "__main__":
+    main()
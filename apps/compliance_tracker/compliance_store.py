@@ -0,0 +1,615 @@
+"""
+Storage backends for the compliance tracker.
+
+    SQLiteStorage  default; one database file in WAL mode, indexed on
+                   store_id, status, category and next_due, so inserts
+                   touch one row and dashboard reads are filtered queries
+    JSONStorage    the original stores.json / compliance_records.json
+                   files, rewritten whole on every change
+
+Both expose the same methods and return plain dicts, so the app does not
+care which one is in use. Pick one with COMPLIANCE_BACKEND=sqlite|json.
+Each backend has a cheap version() that changes whenever the data does;
+CachedStorage uses it to serve repeat reads from memory. Every write is
+also recorded (who, what, when) in an append-only audit trail, read back
+with history().
+
+One-shot migration of existing JSON files into SQLite:
+    python compliance_store.py --migrate [--data-dir /tmp/compliance_data]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: JSONStorage falls back to in-process locking
+    fcntl = None
+
+from compliance_aggregates import ComplianceAggregates
+from compliance_due import DueDateIndex
+from compliance_files import write_json_atomic
+
+STORE_FIELDS = ["id", "name", "region", "manager"]
+RECORD_FIELDS = ["id", "store_id", "category", "status", "last_audit", "next_due", "reviewer", "notes"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    region TEXT,
+    manager TEXT
+);
+CREATE TABLE IF NOT EXISTS compliance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    store_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_audit TEXT,
+    next_due TEXT,
+    reviewer TEXT,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_compliance_store_id ON compliance (store_id);
+CREATE INDEX IF NOT EXISTS idx_compliance_status ON compliance (status);
+CREATE INDEX IF NOT EXISTS idx_compliance_category ON compliance (category);
+CREATE INDEX IF NOT EXISTS idx_compliance_next_due ON compliance (next_due);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS audit_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    at TEXT NOT NULL,
+    user TEXT NOT NULL,
+    op TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_id INTEGER,
+    data TEXT
+);
+"""
+
+
+def _audit_entry(op: str, kind: str, item_id=None, data=None, user: str = None) -> dict:
+    return {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "user": user or "anonymous",
+        "op": op,
+        "kind": kind,
+        "item_id": item_id,
+        "data": data,
+    }
+
+
+def _check_order_by(order_by: str) -> None:
+    if order_by not in RECORD_FIELDS:
+        raise ValueError(f"Cannot sort by '{order_by}' (use one of {RECORD_FIELDS})")
+
+
+def _record_filter(records: list, store_ids=None, status=None, category=None,
+                   due_from: str = None, due_to: str = None) -> list:
+    """In-memory equivalent of SQLiteStorage.records filtering."""
+    if store_ids is not None:
+        store_ids = set(store_ids)
+    return [
+        r for r in records
+        if (store_ids is None or r["store_id"] in store_ids)
+        and (status is None or r["status"] == status)
+        and (category is None or r["category"] == category)
+        and (due_from is None or (r.get("next_due") or "") >= due_from)
+        and (due_to is None or (r.get("next_due") or "") <= due_to)
+    ]
+
+
+class SQLiteStorage:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (Streamlit runs each session in its own thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql: str, params=()) -> list:
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> None:
+        """Call inside every write transaction."""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    @staticmethod
+    def _audit(conn: sqlite3.Connection, entry: dict) -> None:
+        """Call inside the write transaction, so the change and its audit row commit together."""
+        conn.execute(
+            "INSERT INTO audit_log (at, user, op, kind, item_id, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (entry["at"], entry["user"], entry["op"], entry["kind"], entry["item_id"],
+             json.dumps(entry["data"], default=str)),
+        )
+
+    def version(self) -> str:
+        """Data version; bumped by every write, from any process."""
+        return self.get_meta("version") or "0"
+
+    def is_empty(self) -> bool:
+        conn = self._connection()
+        return (conn.execute("SELECT 1 FROM stores LIMIT 1").fetchone() is None
+                and conn.execute("SELECT 1 FROM compliance LIMIT 1").fetchone() is None)
+
+    def stores(self) -> list:
+        return self._query(f"SELECT {', '.join(STORE_FIELDS)} FROM stores ORDER BY id")
+
+    def regions(self) -> list:
+        return [r["region"] for r in self._query("SELECT DISTINCT region FROM stores ORDER BY region")]
+
+    def add_store(self, store: dict, user: str = None) -> dict:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO stores (id, name, region, manager) VALUES (?, ?, ?, ?)",
+                (store.get("id"), store["name"], store.get("region", ""), store.get("manager", "")),
+            )
+            store = {**store, "id": cursor.lastrowid}
+            self._audit(conn, _audit_entry("add", "stores", store["id"], store, user))
+            self._bump_version(conn)
+        return store
+
+    @staticmethod
+    def _where(store_ids=None, status: str = None, category: str = None,
+               due_from: str = None, due_to: str = None) -> tuple:
+        """WHERE clause and params for the record filters."""
+        clauses, params = [], []
+        if store_ids is not None:
+            store_ids = list(store_ids)
+            clauses.append(f"store_id IN ({','.join('?' * len(store_ids))})")
+            params.extend(store_ids)
+        for column, value in (("status", status), ("category", category)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if due_from is not None:
+            clauses.append("next_due >= ?")
+            params.append(due_from)
+        if due_to is not None:
+            clauses.append("next_due <= ?")
+            params.append(due_to)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def records(self, store_ids=None, status: str = None, category: str = None,
+                due_from: str = None, due_to: str = None, order_by: str = "id",
+                descending: bool = False, limit: int = None, offset: int = 0) -> list:
+        """
+        Compliance records matching every given filter, sorted by order_by
+        (ties by id). Pass limit/offset to fetch one page.
+        """
+        _check_order_by(order_by)
+        where, params = self._where(store_ids, status, category, due_from, due_to)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {', '.join(RECORD_FIELDS)} FROM compliance{where} ORDER BY {order_by} {direction}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return self._query(sql, params)
+
+    def count(self, store_ids=None, status: str = None, category: str = None,
+              due_from: str = None, due_to: str = None) -> int:
+        where, params = self._where(store_ids, status, category, due_from, due_to)
+        return self._connection().execute(f"SELECT COUNT(*) FROM compliance{where}", params).fetchone()[0]
+
+    def iter_records(self, chunk_size: int = 10_000, store_ids=None, status: str = None,
+                     category: str = None, due_from: str = None, due_to: str = None):
+        """Yield matching records in id order, chunk_size at a time, for exports."""
+        where, params = self._where(store_ids, status, category, due_from, due_to)
+        cursor = self._connection().execute(f"SELECT {', '.join(RECORD_FIELDS)} FROM compliance{where} ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+
+    def status_counts(self, store_ids=None) -> dict:
+        """{status: record count}, optionally for some stores only."""
+        where, params = self._where(store_ids)
+        rows = self._query(f"SELECT status, COUNT(*) AS n FROM compliance{where} GROUP BY status", params)
+        return {r["status"]: r["n"] for r in rows}
+
+    def aggregates(self) -> ComplianceAggregates:
+        """Dashboard counts from one GROUP BY over the table."""
+        counts = self._connection().execute(
+            "SELECT store_id, status, COUNT(*) FROM compliance GROUP BY store_id, status"
+        ).fetchall()
+        return ComplianceAggregates.from_counts(self.stores(), counts)
+
+    def due_index(self) -> DueDateIndex:
+        """Due-date index over every record with a next_due, read in next_due index order."""
+        entries = self._connection().execute(
+            "SELECT next_due, id, store_id, category FROM compliance "
+            "WHERE next_due IS NOT NULL AND next_due != '' ORDER BY next_due, id"
+        ).fetchall()
+        return DueDateIndex(self.stores(), entries)
+
+    def add_record(self, record: dict, user: str = None) -> dict:
+        """Insert one record; the id is assigned by the database."""
+        values = [record.get(field) for field in RECORD_FIELDS[1:]]
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO compliance ({', '.join(RECORD_FIELDS[1:])}) VALUES ({', '.join('?' * len(values))})",
+                values,
+            )
+            record = {**record, "id": cursor.lastrowid}
+            self._audit(conn, _audit_entry("add", "records", record["id"], record, user))
+            self._bump_version(conn)
+        return record
+
+    def add_stores(self, stores: list, user: str = None) -> int:
+        """Insert many new stores in one transaction (ids assigned by the database)."""
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO stores (name, region, manager) VALUES (?, ?, ?)",
+                [(s["name"], s.get("region", ""), s.get("manager", "")) for s in stores],
+            )
+            self._audit(conn, _audit_entry("bulk add", "stores", data={"stores": len(stores)}, user=user))
+            self._bump_version(conn)
+        return len(stores)
+
+    def add_records(self, records: list, user: str = None) -> int:
+        """Insert many new records in one transaction (ids assigned by the database)."""
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT INTO compliance ({', '.join(RECORD_FIELDS[1:])}) VALUES ({', '.join('?' * (len(RECORD_FIELDS) - 1))})",
+                [tuple(r.get(field) for field in RECORD_FIELDS[1:]) for r in records],
+            )
+            self._audit(conn, _audit_entry("bulk add", "records", data={"records": len(records)}, user=user))
+            self._bump_version(conn)
+        return len(records)
+
+    def import_all(self, stores: list, records: list, user: str = None) -> None:
+        """Bulk load stores and records (keeping their ids) in one transaction."""
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO stores (id, name, region, manager) VALUES (?, ?, ?, ?)",
+                [(s["id"], s["name"], s.get("region", ""), s.get("manager", "")) for s in stores],
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO compliance ({', '.join(RECORD_FIELDS)}) VALUES ({', '.join('?' * len(RECORD_FIELDS))})",
+                [tuple(r.get(field) for field in RECORD_FIELDS) for r in records],
+            )
+            self._audit(conn, _audit_entry("import", "all", data={"stores": len(stores), "records": len(records)}, user=user))
+            self._bump_version(conn)
+
+    def get_meta(self, key: str):
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def history(self, limit: int = 100) -> list:
+        """Most recent audit entries first."""
+        rows = self._query(
+            "SELECT at, user, op, kind, item_id, data FROM audit_log ORDER BY seq DESC LIMIT ?", (limit,)
+        )
+        return [{**row, "data": json.loads(row["data"])} for row in rows]
+
+
+class JSONStorage:
+    """
+    Whole-file JSON storage. Writes hold an exclusive lock on
+    compliance.lock while they re-read, change and atomically replace the
+    file, so concurrent sessions and processes queue instead of losing
+    updates. IDs come from a counter in ids.json that never goes down.
+    Each change is appended to audit.jsonl under the same lock.
+    """
+
+    def __init__(self, stores_file: str, compliance_file: str):
+        self.stores_file = stores_file
+        self.compliance_file = compliance_file
+        data_dir = os.path.dirname(os.path.abspath(compliance_file))
+        self.ids_file = os.path.join(data_dir, "ids.json")
+        self.lock_file = os.path.join(data_dir, "compliance.lock")
+        self.audit_file = os.path.join(data_dir, "audit.jsonl")
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _next_id(self, kind: str, existing: list, count: int = 1) -> int:
+        """
+        Allocate count consecutive ids for kind ("stores" or "records") and
+        return the first; call with the lock held.
+        """
+        ids = {}
+        if os.path.exists(self.ids_file):
+            with open(self.ids_file, "r") as f:
+                ids = json.load(f)
+        next_id = max(ids.get(kind, 0), max((item["id"] for item in existing), default=0)) + 1
+        ids[kind] = next_id + count - 1
+        write_json_atomic(self.ids_file, ids)
+        return next_id
+
+    def _audit(self, entry: dict) -> None:
+        """Append one line to audit.jsonl; call with the lock held."""
+        with open(self.audit_file, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _load(self) -> tuple:
+        stores, records = [], []
+        if os.path.exists(self.stores_file):
+            with open(self.stores_file, "r") as f:
+                stores = json.load(f)
+        if os.path.exists(self.compliance_file):
+            with open(self.compliance_file, "r") as f:
+                records = json.load(f)
+        return stores, records
+
+    def _save(self, stores: list = None, records: list = None) -> None:
+        """Atomically replace whichever files are given."""
+        if stores is not None:
+            write_json_atomic(self.stores_file, stores)
+        if records is not None:
+            write_json_atomic(self.compliance_file, records)
+
+    def is_empty(self) -> bool:
+        return not os.path.exists(self.stores_file) and not os.path.exists(self.compliance_file)
+
+    def version(self) -> str:
+        """mtime and size of both files."""
+        parts = []
+        for path in (self.stores_file, self.compliance_file):
+            try:
+                stat = os.stat(path)
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "/".join(parts)
+
+    def stores(self) -> list:
+        return self._load()[0]
+
+    def regions(self) -> list:
+        return sorted({s["region"] for s in self.stores()})
+
+    def add_store(self, store: dict, user: str = None) -> dict:
+        with self._locked():
+            stores = self._load()[0]
+            store = {**store, "id": store.get("id") or self._next_id("stores", stores)}
+            stores.append(store)
+            self._save(stores=stores)
+            self._audit(_audit_entry("add", "stores", store["id"], store, user))
+        return store
+
+    def records(self, store_ids=None, status: str = None, category: str = None,
+                due_from: str = None, due_to: str = None, order_by: str = "id",
+                descending: bool = False, limit: int = None, offset: int = 0) -> list:
+        _check_order_by(order_by)
+        records = _record_filter(self._load()[1], store_ids, status, category, due_from, due_to)
+        # Missing values sort first, as NULLs do in SQLite
+        records.sort(
+            key=lambda r: (r.get(order_by) is not None, r[order_by] if r.get(order_by) is not None else 0, r["id"]),
+            reverse=descending,
+        )
+        return records[offset:offset + limit] if limit is not None else records[offset:]
+
+    def count(self, store_ids=None, status: str = None, category: str = None,
+              due_from: str = None, due_to: str = None) -> int:
+        return len(_record_filter(self._load()[1], store_ids, status, category, due_from, due_to))
+
+    def iter_records(self, chunk_size: int = 10_000, store_ids=None, status: str = None,
+                     category: str = None, due_from: str = None, due_to: str = None):
+        records = _record_filter(self._load()[1], store_ids, status, category, due_from, due_to)
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size]
+
+    def status_counts(self, store_ids=None) -> dict:
+        counts = {}
+        for r in _record_filter(self._load()[1], store_ids):
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        return counts
+
+    def aggregates(self) -> ComplianceAggregates:
+        return ComplianceAggregates.from_records(*self._load())
+
+    def due_index(self) -> DueDateIndex:
+        stores, records = self._load()
+        return DueDateIndex(stores, [(r.get("next_due"), r["id"], r["store_id"], r["category"]) for r in records])
+
+    def add_record(self, record: dict, user: str = None) -> dict:
+        with self._locked():
+            records = self._load()[1]
+            record = {**record, "id": self._next_id("records", records)}
+            records.append(record)
+            self._save(records=records)
+            self._audit(_audit_entry("add", "records", record["id"], record, user))
+        return record
+
+    def add_stores(self, stores: list, user: str = None) -> int:
+        with self._locked():
+            existing = self._load()[0]
+            first_id = self._next_id("stores", existing, len(stores))
+            existing.extend({**store, "id": first_id + i} for i, store in enumerate(stores))
+            self._save(stores=existing)
+            self._audit(_audit_entry("bulk add", "stores", data={"stores": len(stores)}, user=user))
+        return len(stores)
+
+    def add_records(self, records: list, user: str = None) -> int:
+        with self._locked():
+            existing = self._load()[1]
+            first_id = self._next_id("records", existing, len(records))
+            existing.extend({**record, "id": first_id + i} for i, record in enumerate(records))
+            self._save(records=existing)
+            self._audit(_audit_entry("bulk add", "records", data={"records": len(records)}, user=user))
+        return len(records)
+
+    def import_all(self, stores: list, records: list, user: str = None) -> None:
+        with self._locked():
+            self._save(stores, records)
+            self._audit(_audit_entry("import", "all", data={"stores": len(stores), "records": len(records)}, user=user))
+
+    def history(self, limit: int = 100) -> list:
+        """Most recent audit entries first."""
+        if not os.path.exists(self.audit_file):
+            return []
+        with open(self.audit_file, "r") as f:
+            entries = [json.loads(line) for line in f if line.endswith("\n")]
+        return entries[::-1][:limit]
+
+
+class CachedStorage:
+    """
+    Read-through cache over a storage backend, meant to be shared by every
+    session in the process. Read results are memoised per data version and
+    dropped as soon as storage.version() changes, so a rerun costs one
+    version check instead of a re-parse. Cached results are shared objects:
+    treat them as read-only. Writes go straight to the backend.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # add_record, add_records, import_all, history, ... pass through
+        return getattr(self.storage, name)
+
+    def _cached(self, method: str, *args):
+        version = self.storage.version()
+        key = (method, args)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._results = {}
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+        result = getattr(self.storage, method)(*args)
+        with self._lock:
+            if self._version == version:
+                self._results[key] = result
+        return result
+
+    def version(self) -> str:
+        return self.storage.version()
+
+    def stores(self) -> list:
+        return self._cached("stores")
+
+    def regions(self) -> list:
+        return self._cached("regions")
+
+    def records(self, store_ids=None, status: str = None, category: str = None,
+                due_from: str = None, due_to: str = None, order_by: str = "id",
+                descending: bool = False, limit: int = None, offset: int = 0) -> list:
+        store_ids = tuple(store_ids) if store_ids is not None else None
+        return self._cached("records", store_ids, status, category, due_from, due_to,
+                            order_by, descending, limit, offset)
+
+    def count(self, store_ids=None, status: str = None, category: str = None,
+              due_from: str = None, due_to: str = None) -> int:
+        store_ids = tuple(store_ids) if store_ids is not None else None
+        return self._cached("count", store_ids, status, category, due_from, due_to)
+
+    def status_counts(self, store_ids=None) -> dict:
+        return self._cached("status_counts", tuple(store_ids) if store_ids is not None else None)
+
+    def aggregates(self) -> ComplianceAggregates:
+        return self._cached("aggregates")
+
+    def due_index(self) -> DueDateIndex:
+        return self._cached("due_index")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"version": self._version, "entries": len(self._results), "hits": self.hits, "misses": self.misses}
+
+
+def migrate_json(storage: SQLiteStorage, stores_file: str, compliance_file: str) -> dict:
+    """
+    Copy stores.json / compliance_records.json into SQLite, once.
+    Returns: {"stores": n, "records": n}, zeros if already migrated
+    """
+    if storage.get_meta("migrated_from_json"):
+        return {"stores": 0, "records": 0}
+    stores, records = JSONStorage(stores_file, compliance_file)._load()
+    storage.import_all(stores, records, user="json migration")
+    storage.set_meta("migrated_from_json", json.dumps({"stores": stores_file, "records": compliance_file}))
+    return {"stores": len(stores), "records": len(records)}
+
+
+def open_storage(data_dir: str, sample_stores: list = None, sample_records: list = None):
+    """
+    The backend chosen by COMPLIANCE_BACKEND (default sqlite) for data_dir.
+    A new SQLite database imports any existing JSON files first; a
+    completely empty store is seeded with the sample data.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    stores_file = os.path.join(data_dir, "stores.json")
+    compliance_file = os.path.join(data_dir, "compliance_records.json")
+    backend = os.environ.get("COMPLIANCE_BACKEND", "sqlite")
+
+    if backend == "json":
+        storage = JSONStorage(stores_file, compliance_file)
+    elif backend == "sqlite":
+        storage = SQLiteStorage(os.path.join(data_dir, "compliance.db"))
+        if storage.is_empty() and (os.path.exists(stores_file) or os.path.exists(compliance_file)):
+            migrate_json(storage, stores_file, compliance_file)
+    else:
+        raise ValueError(f"Unknown COMPLIANCE_BACKEND '{backend}' (use sqlite or json)")
+
+    if storage.is_empty() and sample_stores is not None:
+        storage.import_all(sample_stores, sample_records or [], user="sample data")
+    return storage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compliance tracker storage tools.")
+    parser.add_argument("--data-dir", default="/tmp/compliance_data")
+    parser.add_argument("--migrate", action="store_true", help="copy the JSON files into compliance.db")
+    args = parser.parse_args()
+
+    if args.migrate:
+        storage = SQLiteStorage(os.path.join(args.data_dir, "compliance.db"))
+        counts = migrate_json(
+            storage,
+            os.path.join(args.data_dir, "stores.json"),
+            os.path.join(args.data_dir, "compliance_records.json"),
+        )
+        print(f"✅ Migrated {counts['stores']} stores and {counts['records']} records into {storage.path}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
+import io
 import os
+import sys
+import tempfile
 import pandas as pd
-import json
 from datetime import datetime, timedelta
 import streamlit as st
 
+# Sibling modules, also when imported as apps.compliance_tracker.compliance_tracker
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compliance_export import FORMATS, available_formats, export_chunks
+from compliance_import import import_csv
+from compliance_store import RECORD_FIELDS, CachedStorage, open_storage
+
 # --- CONFIGURATION ---
 st.set_page_config(
     page_title="Compliance Tracker | ForgeStack Africa",
@@ -15,10 +23,6 @@ st.set_page_config(
 # --- DATA STORAGE ---
 # Use /tmp for Streamlit Cloud (ephemeral) - this works for both local and cloud
 DATA_DIR = "/tmp/compliance_data"
-os.makedirs(DATA_DIR, exist_ok=True)
-
-STORES_FILE = os.path.join(DATA_DIR, "stores.json")
-COMPLIANCE_FILE = os.path.join(DATA_DIR, "compliance_records.json")
 
 # --- SAMPLE DATA FOR DEMO ---
 SAMPLE_STORES = [
@@ -61,28 +65,73 @@ SAMPLE_COMPLIANCE = [
     },
 ]
 
-def load_data():
-    """Load data from JSON or initialize with sample data"""
-    if not os.path.exists(STORES_FILE):
-        with open(STORES_FILE, 'w') as f:
-            json.dump(SAMPLE_STORES, f)
-    if not os.path.exists(COMPLIANCE_FILE):
-        with open(COMPLIANCE_FILE, 'w') as f:
-            json.dump(SAMPLE_COMPLIANCE, f)
-    
-    with open(STORES_FILE, 'r') as f:
-        stores = json.load(f)
-    with open(COMPLIANCE_FILE, 'r') as f:
-        compliance = json.load(f)
+CATEGORIES = [
+    "Fire Safety Certificate",
+    "Liquor License",
+    "Health & Safety",
+    "COIDA Registration",
+    "Tax Clearance Certificate",
+    "BEE Certificate",
+    "Environmental Permit",
+    "Building Occupancy Certificate",
+    "Food Safety License"
+]
+
+# --- RECORDS TABLE ---
+PAGE_SIZES = [25, 50, 100]
+SORT_OPTIONS = {
+    "Newest first": ("id", True),
+    "Next due (soonest)": ("next_due", False),
+    "Last audit (latest)": ("last_audit", True),
+    "Status": ("status", False),
+    "Category": ("category", False),
+}
+STATUS_STYLES = {
+    'Compliant': 'background-color: #d1fae5; color: #065f46',
+    'Pending Review': 'background-color: #fef3c7; color: #92400e',
+    'Action Required': 'background-color: #fee2e2; color: #991b1b',
+}
+
+def records_frame(records, store_map):
+    """Display frame for a list of compliance records"""
+    df = pd.DataFrame(records, columns=RECORD_FIELDS)
+    df['store_name'] = df['store_id'].map(store_map)
+    df_display = df[['store_name', 'category', 'status', 'last_audit', 'next_due', 'reviewer', 'notes']]
+    df_display.columns = ['Store', 'Category', 'Status', 'Last Audit', 'Next Due', 'Reviewer', 'Notes']
+    return df_display
+
+EXPORT_COLUMNS = [
+    ('store_name', 'Store'), ('category', 'Category'), ('status', 'Status'), ('last_audit', 'Last Audit'),
+    ('next_due', 'Next Due'), ('reviewer', 'Reviewer'), ('notes', 'Notes')
+]
+
+def export_records(storage, store_ids, store_map, export_format, extension, progress):
+    """Stream matching records into an export file; returns its path"""
+    def chunks():
+        for chunk in storage.iter_records(store_ids=store_ids):
+            for record in chunk:
+                record['store_name'] = store_map.get(record['store_id'])
+            yield chunk
     
-    return stores, compliance
+    fd, path = tempfile.mkstemp(prefix="compliance_report_", suffix=extension)
+    os.close(fd)
+    try:
+        export_chunks(chunks(), EXPORT_COLUMNS, export_format, path, progress)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+def style_status(column):
+    """Colour a whole Status column in one vectorized lookup"""
+    return column.map(STATUS_STYLES).fillna('')
 
-def save_data(stores, compliance):
-    """Save data to JSON"""
-    with open(STORES_FILE, 'w') as f:
-        json.dump(stores, f, indent=2)
-    with open(COMPLIANCE_FILE, 'w') as f:
-        json.dump(compliance, f, indent=2, default=str)
+@st.cache_resource
+def get_storage():
+    """One storage + read cache per process, shared by every user session"""
+    return CachedStorage(open_storage(DATA_DIR, SAMPLE_STORES, SAMPLE_COMPLIANCE))
+
+storage = get_storage()
 
 # --- CUSTOM CSS FOR PROFESSIONAL LOOK ---
 st.markdown("""
@@ -148,7 +197,8 @@ def main():
     st.markdown('<p class="sub-header">Multi-location compliance management for South African retail operations</p>', unsafe_allow_html=True)
     
     # Load data
-    stores, compliance = load_data()
+    stores = storage.stores()
+    aggregates = storage.aggregates()
     
     # Sidebar
     with st.sidebar:
@@ -157,9 +207,9 @@ def main():
         st.markdown("### 🏢 Quick Stats")
         
         total_stores = len(stores)
-        total_records = len(compliance)
-        compliant_count = len([c for c in compliance if c['status'] == 'Compliant'])
-        action_required = len([c for c in compliance if c['status'] == 'Action Required'])
+        total_records = aggregates.count()
+        compliant_count = aggregates.count('Compliant')
+        action_required = aggregates.count('Action Required')
         
         st.metric("Total Stores", total_stores)
         st.metric("Compliance Records", total_records)
@@ -170,15 +220,19 @@ def main():
         
         st.markdown("---")
         st.markdown("### 📍 Filter by Region")
-        regions = list(set([s['region'] for s in stores]))
+        regions = storage.regions()
         selected_region = st.selectbox("Select Region", ["All"] + regions)
         
+        st.markdown("---")
+        # Recorded against every change in the audit trail
+        current_user = st.text_input("👤 Your name", key="current_user").strip() or None
+        
         st.markdown("---")
         st.markdown("**Made in Cape Town 🇿🇦**")
         st.markdown("*ForgeStack Africa*")
     
     # Main content tabs
-    tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "🏪 Stores", "➕ Add Record"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Dashboard", "🏪 Stores", "⏰ Due Soon", "➕ Add Record"])
     
     with tab1:
         # Metrics row
@@ -202,7 +256,7 @@ def main():
             """, unsafe_allow_html=True)
         
         with col3:
-            pending = len([c for c in compliance if c['status'] == 'Pending Review'])
+            pending = aggregates.count('Pending Review')
             st.markdown(f"""
             <div style="background: #fef3c7; padding: 1rem; border-radius: 0.5rem; text-align: center;">
                 <div style="font-size: 2rem; font-weight: bold; color: #92400e;">{pending}</div>
@@ -211,7 +265,7 @@ def main():
             """, unsafe_allow_html=True)
         
         with col4:
-            overdue = len([c for c in compliance if c['status'] == 'Action Required'])
+            overdue = action_required
             st.markdown(f"""
             <div style="background: #fee2e2; padding: 1rem; border-radius: 0.5rem; text-align: center;">
                 <div style="font-size: 2rem; font-weight: bold; color: #991b1b;">{overdue}</div>
@@ -225,46 +279,63 @@ def main():
         st.subheader("📋 Recent Compliance Records")
         
         # Filter by region if selected
+        store_ids = None
         if selected_region != "All":
             store_ids = [s['id'] for s in stores if s['region'] == selected_region]
-            filtered_compliance = [c for c in compliance if c['store_id'] in store_ids]
-        else:
-            filtered_compliance = compliance
+        total_matching = storage.count(store_ids=store_ids)
         
-        if filtered_compliance:
-            df = pd.DataFrame(filtered_compliance)
-            # Add store names
-            store_map = {s['id']: s['name'] for s in stores}
-            df['store_name'] = df['store_id'].map(store_map)
-            
-            # Reorder columns
-            df_display = df[['store_name', 'category', 'status', 'last_audit', 'next_due', 'reviewer', 'notes']]
-            df_display.columns = ['Store', 'Category', 'Status', 'Last Audit', 'Next Due', 'Reviewer', 'Notes']
+        if total_matching:
+            # Only the visible page is fetched from storage
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                sort_label = st.selectbox("Sort by", list(SORT_OPTIONS))
+            with col2:
+                page_size = st.selectbox("Rows per page", PAGE_SIZES)
+            page_count = (total_matching - 1) // page_size + 1
+            with col3:
+                page = st.number_input(
+                    f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1,
+                    key=f"records_page_{selected_region}_{page_size}"
+                )
             
-            # Color coding
-            def color_status(val):
-                if val == 'Compliant':
-                    return 'background-color: #d1fae5; color: #065f46'
-                elif val == 'Pending Review':
-                    return 'background-color: #fef3c7; color: #92400e'
-                elif val == 'Action Required':
-                    return 'background-color: #fee2e2; color: #991b1b'
-                return ''
+            order_by, descending = SORT_OPTIONS[sort_label]
+            offset = (page - 1) * page_size
+            page_records = storage.records(
+                store_ids=store_ids, order_by=order_by, descending=descending,
+                limit=page_size, offset=offset
+            )
+            store_map = {s['id']: s['name'] for s in stores}
+            df_display = records_frame(page_records, store_map)
             
             st.dataframe(
-                df_display.style.applymap(color_status, subset=['Status']),
+                df_display.style.apply(style_status, subset=['Status']),
                 use_container_width=True,
                 hide_index=True
             )
+            st.caption(f"Showing {offset + 1}–{offset + len(page_records)} of {total_matching} records")
             
-            # Export button
-            csv = df_display.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Export to CSV",
-                data=csv,
-                file_name=f"compliance_report_{datetime.now().strftime('%Y-%m-%d')}.csv",
-                mime="text/csv"
-            )
+            # Export (streamed from storage in chunks, only when asked for)
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                export_format = st.selectbox("Export format", available_formats())
+            if st.button("📥 Prepare export"):
+                extension, mime = FORMATS[export_format]
+                progress_bar = st.progress(0.0, text="Exporting...")
+                # Records added during the export can push done past the count taken above
+                path = export_records(storage, store_ids, store_map, export_format, extension,
+                                      lambda done: progress_bar.progress(min(done / total_matching, 1.0), text=f"Exported {done:,} of {total_matching:,} records"))
+                progress_bar.empty()
+                try:
+                    # The button keeps its own copy of the file, so it can go straight away
+                    with open(path, 'rb') as f:
+                        st.download_button(
+                            label=f"📥 Download {export_format}",
+                            data=f,
+                            file_name=f"compliance_report_{datetime.now().strftime('%Y-%m-%d')}{extension}",
+                            mime=mime
+                        )
+                finally:
+                    os.remove(path)
         else:
             st.info("No compliance records found for selected filters.")
     
@@ -279,18 +350,68 @@ def main():
                     st.write(f"**Region:** {store['region']}")
                     
                     # Show compliance summary for this store
-                    store_compliance = [c for c in compliance if c['store_id'] == store['id']]
-                    if store_compliance:
-                        compliant = len([c for c in store_compliance if c['status'] == 'Compliant'])
-                        st.write(f"**Compliance:** {compliant}/{len(store_compliance)} items compliant")
+                    store_counts = aggregates.store(store['id'])
+                    store_total = sum(store_counts.values())
+                    if store_total:
+                        st.write(f"**Compliance:** {store_counts['Compliant']}/{store_total} items compliant")
                 
                 with col2:
                     # Mini status chart
-                    if store_compliance:
-                        status_counts = pd.DataFrame(store_compliance)['status'].value_counts()
+                    if store_total:
+                        status_counts = pd.Series(dict(store_counts.most_common()), name='count')
                         st.bar_chart(status_counts)
     
     with tab3:
+        st.subheader("⏰ Upcoming Renewals")
+        
+        due_index = storage.due_index()
+        store_names = {s['id']: s['name'] for s in stores}
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            days = st.slider("Due within (days)", min_value=7, max_value=365, value=30, step=7)
+        with col2:
+            scope_type = st.selectbox("Scope", ["All", "Region", "Store", "Category"])
+        with col3:
+            # Same scope drives the counts, the list and the forecast
+            scope, due_filter = None, {}
+            if scope_type == "Region" and regions:
+                region = st.selectbox("Region", regions)
+                scope = ("region", region)
+                due_filter = {"store_ids": [s['id'] for s in stores if s['region'] == region]}
+            elif scope_type == "Store" and stores:
+                store_id = st.selectbox("Store", options=list(store_names.keys()), format_func=lambda x: store_names[x], key="due_store")
+                scope = ("store", store_id)
+                due_filter = {"store_ids": [store_id]}
+            elif scope_type == "Category":
+                due_category = st.selectbox("Category", CATEGORIES)
+                scope = ("category", due_category)
+                due_filter = {"category": due_category}
+        
+        today = datetime.now().date()
+        due_count = len(due_index.due_within(days, today=today, scope=scope))
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(f"Due in the next {days} days", due_count)
+        with col2:
+            st.metric("Overdue", due_index.overdue(today=today, scope=scope))
+        
+        if due_count:
+            due_records = storage.records(
+                due_from=today.strftime("%Y-%m-%d"),
+                due_to=(today + timedelta(days=days)).strftime("%Y-%m-%d"),
+                order_by="next_due", limit=100, **due_filter
+            )
+            st.dataframe(records_frame(due_records, store_names), use_container_width=True, hide_index=True)
+            if due_count > len(due_records):
+                st.caption(f"Showing the {len(due_records)} soonest of {due_count}")
+        
+        st.markdown("#### 📅 Renewal Workload – Next 12 Months")
+        forecast = pd.DataFrame(due_index.weekly_forecast(today, weeks=52, scope=scope), columns=["Week", "Due"])
+        st.bar_chart(forecast.set_index("Week"))
+    
+    with tab4:
         st.subheader("➕ Add New Compliance Record")
         
         with st.form("add_compliance"):
@@ -299,17 +420,7 @@ def main():
             with col1:
                 store_names = {s['id']: s['name'] for s in stores}
                 selected_store = st.selectbox("Store", options=list(store_names.keys()), format_func=lambda x: store_names[x])
-                category = st.selectbox("Compliance Category", [
-                    "Fire Safety Certificate",
-                    "Liquor License", 
-                    "Health & Safety",
-                    "COIDA Registration",
-                    "Tax Clearance Certificate",
-                    "BEE Certificate",
-                    "Environmental Permit",
-                    "Building Occupancy Certificate",
-                    "Food Safety License"
-                ])
+                category = st.selectbox("Compliance Category", CATEGORIES)
             
             with col2:
                 status = st.selectbox("Status", ["Compliant", "Pending Review", "Action Required"])
@@ -323,7 +434,6 @@ def main():
             
             if submitted:
                 new_record = {
-                    "id": len(compliance) + 1,
                     "store_id": selected_store,
                     "category": category,
                     "status": status,
@@ -332,10 +442,45 @@ def main():
                     "reviewer": reviewer,
                     "notes": notes
                 }
-                compliance.append(new_record)
-                save_data(stores, compliance)
+                storage.add_record(new_record, user=current_user)
                 st.success("✅ Record added successfully!")
                 st.balloons()
+        
+        with st.expander("📤 Bulk import from CSV"):
+            st.caption(
+                "Stores: name, region, manager. Records: store_id (or store name), category, status, "
+                "last_audit, next_due (YYYY-MM-DD), reviewer, notes."
+            )
+            import_kind = st.radio("Import", ["records", "stores"], horizontal=True, key="import_kind")
+            upload = st.file_uploader("CSV file", type=["csv"], key="import_file")
+            if upload is not None and st.button("📤 Import", key="import_btn"):
+                progress_bar = st.progress(0.0, text="Importing...")
+                result = import_csv(
+                    storage, import_kind, io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""),
+                    categories=CATEGORIES if import_kind == "records" else None, user=current_user,
+                    progress=lambda rows: progress_bar.progress(
+                        min(upload.tell() / max(upload.size, 1), 1.0), text=f"Read {rows:,} rows")
+                )
+                progress_bar.empty()
+                st.success(f"✅ Imported {result['imported']:,} {import_kind}")
+                if result["failed"]:
+                    st.warning(f"⚠️ {result['failed']:,} rows rejected")
+                    st.dataframe(pd.DataFrame(result["errors"], columns=["Line", "Error"]),
+                                 use_container_width=True, hide_index=True)
+        
+        with st.expander("🕘 Recent changes"):
+            history = storage.history(limit=50)
+            if history:
+                st.dataframe(pd.DataFrame([{
+                    "When": entry["at"],
+                    "User": entry["user"],
+                    "Action": entry["op"].title(),
+                    "Type": entry["kind"].title(),
+                    "ID": "" if entry["item_id"] is None else f"#{entry['item_id']}",
+                    "Details": ", ".join(f"{k}: {v}" for k, v in (entry["data"] or {}).items() if k != "id")
+                } for entry in history]), use_container_width=True, hide_index=True)
+            else:
+                st.info("No changes recorded yet.")
     
     # Footer
     st.markdown("""
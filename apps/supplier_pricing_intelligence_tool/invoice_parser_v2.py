@@ -1,4 +1,11 @@
+import argparse
 import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
 
 def load_invoice_rows(csv_path: str) -> list[dict]:
     """Load invoice rows from a CSV file into a list of dictionaries."""
@@ -7,7 +14,23 @@ def load_invoice_rows(csv_path: str) -> list[dict]:
         return list(reader)
 
 
-def find_cheapest_per_item(rows: list[dict]) -> dict:
+def iter_invoice_rows(csv_path: str) -> Iterator[dict]:
+    """Yield invoice rows one at a time instead of loading the whole file."""
+    with open(csv_path, newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def fold_row(cheapest: dict, row: dict) -> None:
+    """Fold a single invoice row into the running cheapest-per-item result."""
+    item = row["item"].strip()
+    supplier = row["supplier"].strip()
+    price = float(row["price"])
+
+    if item not in cheapest or price < cheapest[item]["price"]:
+        cheapest[item] = {"supplier": supplier, "price": price}
+
+
+def find_cheapest_per_item(rows: Iterable[dict]) -> dict:
     """
     Business logic:
     For each item, find the supplier offering the lowest price.
@@ -16,16 +39,110 @@ def find_cheapest_per_item(rows: list[dict]) -> dict:
     cheapest: dict = {}
 
     for row in rows:
-        item = row["item"].strip()
-        supplier = row["supplier"].strip()
-        price = float(row["price"])
+        fold_row(cheapest, row)
+
+    return cheapest
 
-        if item not in cheapest or price < cheapest[item]["price"]:
-            cheapest[item] = {"supplier": supplier, "price": price}
 
+def stream_cheapest_per_item(csv_path: str) -> tuple[dict, dict]:
+    """
+    Streaming version of load_invoice_rows + find_cheapest_per_item.
+    Each row is folded into the per-item minimum as it is read, so memory
+    is bounded by the number of distinct items, not the number of rows.
+    Returns: (cheapest, {"rows": int, "seconds": float, "rows_per_second": float})
+    """
+    cheapest: dict = {}
+    rows = 0
+    start = time.perf_counter()
+
+    for row in iter_invoice_rows(csv_path):
+        fold_row(cheapest, row)
+        rows += 1
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+    }
+    return cheapest, stats
+
+
+def merge_cheapest(cheapest: dict, other: dict) -> dict:
+    """
+    Reduction step for batch mode: fold another cheapest-per-item result
+    into cheapest. Ties keep the existing entry, as in fold_row.
+    """
+    for item, data in other.items():
+        if item not in cheapest or data["price"] < cheapest[item]["price"]:
+            cheapest[item] = data
     return cheapest
 
 
+def expand_invoice_paths(patterns: list) -> list:
+    """
+    Resolve directories (all *.csv inside) and globs to a sorted file list.
+    Subdirectories a glob matches are skipped; a name matching nothing is
+    kept so it is reported as not found.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            paths.extend(glob.glob(pattern) or [pattern])
+    return sorted(p for p in set(paths) if os.path.isfile(p) or not os.path.exists(p))
+
+
+def _parse_invoice_file(csv_path: str) -> tuple:
+    """Worker for batch mode: (path, cheapest, stats, error message or None)."""
+    try:
+        cheapest, stats = stream_cheapest_per_item(csv_path)
+        return csv_path, cheapest, stats, None
+    except FileNotFoundError:
+        return csv_path, {}, None, "file not found"
+    except OSError as e:  # e.g. a directory or no read permission
+        return csv_path, {}, None, e.strerror or str(e)
+    except KeyError as e:
+        return csv_path, {}, None, f"missing expected column {e}"
+    except (AttributeError, TypeError):
+        # A short row leaves trailing fields as None
+        return csv_path, {}, None, "malformed row: missing fields"
+    except UnicodeDecodeError:  # a ValueError, so check it first
+        return csv_path, {}, None, "file is not valid text; check its encoding"
+    except ValueError:
+        return csv_path, {}, None, "price must be a number"
+
+
+def run_batch(paths: list, workers: Optional[int] = None) -> tuple:
+    """
+    Parse invoice files in parallel across a process pool and merge the
+    per-file results in path order.
+    Returns: (cheapest, per-file results as (path, stats, error))
+    """
+    cheapest: dict = {}
+    per_file = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, file_cheapest, stats, error in pool.map(_parse_invoice_file, paths):
+            merge_cheapest(cheapest, file_cheapest)
+            per_file.append((path, stats, error))
+
+    return cheapest, per_file
+
+
+def print_file_timings(per_file: list) -> None:
+    print("\nPer-file timing:")
+    for path, stats, error in per_file:
+        if error:
+            print(f"- {path}: FAILED ({error})")
+        else:
+            print(
+                f"- {path}: {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+                f"({stats['rows_per_second']:,.0f} rows/sec)"
+            )
+
+
 def print_summary(cheapest: dict) -> None:
     print("\nCheapest supplier per item:")
 
@@ -38,15 +155,51 @@ def print_summary(cheapest: dict) -> None:
     print(f"\nTotal (1 of each item): R{total:.2f}")
 
 
+def print_throughput(stats: dict) -> None:
+    print(
+        f"\nProcessed {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:,.0f} rows/sec)"
+    )
+
+
+def main_batch(patterns: list, workers: Optional[int] = None) -> int:
+    paths = expand_invoice_paths(patterns)
+    if not paths:
+        print("No invoice CSV files found.")
+        return 1
+
+    print(f"Parsing {len(paths)} invoice file(s)...")
+    start = time.perf_counter()
+    cheapest, per_file = run_batch(paths, workers)
+    seconds = time.perf_counter() - start
+
+    print_file_timings(per_file)
+    print_summary(cheapest)
+
+    rows = sum(stats["rows"] for _, stats, error in per_file if not error)
+    print_throughput({"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds > 0 else 0.0})
+    return 1 if any(error for _, _, error in per_file) else 0
+
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Find the cheapest supplier per item in invoice CSVs.")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="invoice CSV files, directories or glob patterns (batch mode); prompts for one file if omitted",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="parallel parser processes (default: CPU count)")
+    args = parser.parse_args()
+
     print("=== Invoice Parser v2 ===")
+    if args.paths:
+        raise SystemExit(main_batch(args.paths, args.workers))
+
     csv_path = input("Enter invoice CSV filename: ").strip()
 
     try:
-        rows = load_invoice_rows(csv_path)
-        cheapest = find_cheapest_per_item(rows)
+        cheapest, stats = stream_cheapest_per_item(csv_path)
         print_summary(cheapest)
+        print_throughput(stats)
     except FileNotFoundError:
         print("File not found. Check the filename/path.")
     except KeyError as e:
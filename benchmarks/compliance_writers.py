@@ -0,0 +1,115 @@
+"""
+Stress test: many processes adding compliance records at the same time.
+
+Runs parallel writers (processes x threads) against each compliance
+storage backend, then checks that no insert was lost, no id was handed
+out twice and every writer saw its ids increase:
+
+    sqlite    apps/compliance_tracker SQLiteStorage
+    json      apps/compliance_tracker JSONStorage
+    archive   playground/archive_frontend ComplianceData
+
+    python benchmarks/compliance_writers.py --processes 8 --threads 4 --writes 50
+Exits non-zero if any check fails.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "apps", "compliance_tracker"))
+sys.path.insert(0, os.path.join(ROOT, "playground", "archive_frontend"))
+
+BACKENDS = ["sqlite", "json", "archive"]
+
+
+def open_backend(backend: str, data_dir: str):
+    if backend == "archive":
+        from compliance_data import ComplianceData
+        return ComplianceData(data_dir)
+    from compliance_store import JSONStorage, SQLiteStorage
+    if backend == "sqlite":
+        return SQLiteStorage(os.path.join(data_dir, "compliance.db"))
+    return JSONStorage(os.path.join(data_dir, "stores.json"), os.path.join(data_dir, "compliance_records.json"))
+
+
+def load_records(backend: str, data_dir: str) -> list:
+    storage = open_backend(backend, data_dir)
+    if backend == "archive":
+        return storage.load()[1]
+    return storage.records()
+
+
+def _writer_thread(storage, writer: str, writes: int) -> list:
+    ids = []
+    for i in range(writes):
+        record = storage.add_record({
+            "store_id": 1,
+            "category": "Fire Safety Certificate",
+            "status": "Compliant",
+            "next_due": "2027-01-01",
+            "reviewer": writer,
+            "notes": str(i),
+        })
+        ids.append(record["id"])
+    return ids
+
+
+def _writer_process(args) -> dict:
+    backend, data_dir, process_no, threads, writes = args
+    storage = open_backend(backend, data_dir)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {
+            f"p{process_no}t{t}": pool.submit(_writer_thread, storage, f"p{process_no}t{t}", writes)
+            for t in range(threads)
+        }
+        return {writer: future.result() for writer, future in futures.items()}
+
+
+def stress(backend: str, processes: int, threads: int, writes: int) -> bool:
+    expected = processes * threads * writes
+    with tempfile.TemporaryDirectory() as data_dir:
+        open_backend(backend, data_dir)  # create schema / files before the race
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_writer_process, [(backend, data_dir, p, threads, writes) for p in range(processes)])
+        elapsed = time.perf_counter() - start
+
+        returned = {writer: ids for result in results for writer, ids in result.items()}
+        all_ids = [i for ids in returned.values() for i in ids]
+        stored = load_records(backend, data_dir)
+
+    checks = {
+        "no lost inserts": len(stored) == expected,
+        "unique ids": len(set(all_ids)) == expected and len({r["id"] for r in stored}) == len(stored),
+        "stored ids match returned ids": {r["id"] for r in stored} == set(all_ids),
+        "ids increase per writer": all(ids == sorted(ids) for ids in returned.values()),
+        "every writer's rows stored": all(
+            sum(1 for r in stored if r.get("reviewer") == writer) == writes for writer in returned
+        ),
+    }
+    print(f"{backend:<8} {expected:>6} writes in {elapsed:6.2f}s ({expected / elapsed:8.0f} writes/s), "
+          f"{len(stored)} stored")
+    for name, ok in checks.items():
+        print(f"    {'✅' if ok else '❌'} {name}")
+    return all(checks.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel-writer stress test for compliance storage.")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4, help="writer threads per process")
+    parser.add_argument("--writes", type=int, default=25, help="inserts per writer thread")
+    args = parser.parse_args()
+
+    ok = all([stress(backend, args.processes, args.threads, args.writes) for backend in args.backends])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Benchmark suite for the supplier pricing pipeline.
+
+Generates synthetic invoice CSVs and measures every engine and endpoint:
+
+    parser.load          invoice_parser_v2.load_invoice_rows + find_cheapest_per_item
+    parser.stream        invoice_parser_v2.stream_cheapest_per_item
+    insights.python      archive_api compute_insights (row-by-row)
+    insights.columnar    archive_api compute_insights_columnar
+    api.cheapest         POST /cheapest (in-process ASGI client)
+    api.upload           POST /upload
+    api.upload_stream    POST /upload?stream=true
+
+Each case runs in its own process so peak RSS is per case (for the API
+cases that is the API process; pool workers are not included). Results are
+written as JSON tagged with the git commit, for comparing runs:
+
+    python benchmarks/supplier_pricing.py --sizes 1000 100000
+    python benchmarks/supplier_pricing.py --compare old.json new.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "apps", "supplier_pricing_intelligence_tool"))
+sys.path.insert(0, os.path.join(ROOT, "playground", "archive_api"))
+
+# Keep the API honest while benchmarking: no result cache, no history
+# writes, and no job timeout cutting off the 10M-row cases
+os.environ.setdefault("INSIGHT_CACHE_SIZE", "0")
+os.environ.setdefault("PRICE_STORE_DIR", "")
+os.environ.setdefault("INSIGHT_JOB_TIMEOUT", "3600")
+
+TARGETS = [
+    "parser.load",
+    "parser.stream",
+    "insights.python",
+    "insights.columnar",
+    "api.cheapest",
+    "api.upload",
+    "api.upload_stream",
+]
+
+
+def generate_invoice_csv(path: str, rows: int, items: int, suppliers: int, seed: int = 42) -> None:
+    """Write a synthetic invoice CSV with the given item/supplier cardinality."""
+    rng = random.Random(seed)
+    item_names = [f"Item {i}" for i in range(items)]
+    supplier_names = [f"Supplier {i}" for i in range(suppliers)]
+    base_price = [rng.uniform(5, 500) for _ in range(items)]
+
+    with open(path, "w", newline="") as f:
+        f.write("item,supplier,price\n")
+        batch = []
+        for _ in range(rows):
+            i = rng.randrange(items)
+            price = base_price[i] * rng.uniform(0.8, 1.2)
+            batch.append(f"{item_names[i]},{rng.choice(supplier_names)},{price:.2f}\n")
+            if len(batch) >= 100_000:
+                f.writelines(batch)
+                batch = []
+        f.writelines(batch)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _make_runner(target: str, csv_path: str):
+    """Return a zero-argument callable that runs target once over csv_path."""
+    if target == "parser.load":
+        import invoice_parser_v2
+        return lambda: invoice_parser_v2.find_cheapest_per_item(invoice_parser_v2.load_invoice_rows(csv_path))
+
+    if target == "parser.stream":
+        import invoice_parser_v2
+        return lambda: invoice_parser_v2.stream_cheapest_per_item(csv_path)
+
+    if target in ("insights.python", "insights.columnar"):
+        import main
+        engine = main.ENGINES[target.split(".")[1]]
+
+        def run():
+            with open(csv_path, "r", newline="") as f:
+                return engine(f.read())
+        return run
+
+    import asyncio
+    import httpx
+    import main
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=None)
+
+    async def request():
+        if target == "api.cheapest":
+            with open(csv_path, "r", newline="") as f:
+                response = await client.post("/cheapest", json={"csv_text": f.read()})
+        else:
+            params = {"stream": "true"} if target == "api.upload_stream" else {}
+            with open(csv_path, "rb") as f:
+                response = await client.post("/upload", params=params, files={"file": ("invoice.csv", f)})
+        response.raise_for_status()
+        return response
+
+    return lambda: loop.run_until_complete(request())
+
+
+def _run_case(target: str, csv_path: str, repeats: int, warmup: int, queue) -> None:
+    """Child-process entry point: time target `repeats` times after `warmup` untimed runs."""
+    try:
+        run = _make_runner(target, csv_path)
+        baseline = _peak_rss_mb()
+        for _ in range(warmup):
+            run()
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - start)
+        queue.put({"latencies": latencies, "baseline_rss_mb": baseline, "peak_rss_mb": _peak_rss_mb()})
+    except Exception as e:  # report, don't hang the parent
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        # Same as the app lifespan: stop pool workers so this process can exit
+        if "main" in sys.modules:
+            sys.modules["main"].insight_pool.shutdown()
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method="inclusive")[int(q) - 1]
+
+
+def run_case(target: str, csv_path: str, rows: int, repeats: int, warmup: int = 1) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_case, args=(target, csv_path, repeats, warmup, queue))
+    process.start()
+    outcome = queue.get()
+    process.join()
+
+    result = {"target": target, "rows": rows, "repeats": repeats, "warmup": warmup}
+    if "error" in outcome:
+        result["error"] = outcome["error"]
+        return result
+
+    latencies = outcome["latencies"]
+    result.update({
+        "throughput_rows_per_s": round(rows / statistics.median(latencies), 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "min": round(min(latencies) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "peak_rss_mb": round(outcome["peak_rss_mb"], 1),
+        "baseline_rss_mb": round(outcome["baseline_rss_mb"], 1),
+    })
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def repeats_for(rows: int, requested: int) -> int:
+    """Fewer repeats for huge inputs so a 10M-row run finishes in minutes."""
+    if requested:
+        return requested
+    if rows <= 10_000:
+        return 50
+    if rows <= 1_000_000:
+        return 5
+    return 1
+
+
+def run_suite(args) -> dict:
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"sizes": args.sizes, "items": args.items, "suppliers": args.suppliers, "seed": args.seed},
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            csv_path = os.path.join(tmp, f"invoice_{rows}.csv")
+            print(f"Generating {rows:,} rows ({args.items} items, {args.suppliers} suppliers)...")
+            generate_invoice_csv(csv_path, rows, args.items, args.suppliers, args.seed)
+
+            for target in args.targets:
+                result = run_case(target, csv_path, rows, repeats_for(rows, args.repeats), args.warmup)
+                result.update({"items": args.items, "suppliers": args.suppliers})
+                report["results"].append(result)
+                if "error" in result:
+                    print(f"  {target:<20} ERROR {result['error']}")
+                else:
+                    print(
+                        f"  {target:<20} {result['throughput_rows_per_s']:>14,.0f} rows/s  "
+                        f"p50 {result['latency_ms']['p50']:>10.1f}ms  p99 {result['latency_ms']['p99']:>10.1f}ms  "
+                        f"peak RSS {result['peak_rss_mb']:>8.1f}MB"
+                    )
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {output}")
+    return report
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print p50 latency and throughput changes between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def key(result):
+        return result["target"], result["rows"], result.get("items"), result.get("suppliers")
+
+    baseline = {key(r): r for r in old["results"] if "error" not in r}
+    print(f"{old['commit']} -> {new['commit']}")
+    for result in new["results"]:
+        before = baseline.get(key(result))
+        if before is None or "error" in result:
+            continue
+        speedup = before["latency_ms"]["p50"] / result["latency_ms"]["p50"] if result["latency_ms"]["p50"] else 0
+        print(
+            f"  {result['target']:<20} {result['rows']:>10,} rows  "
+            f"p50 {before['latency_ms']['p50']:>10.1f} -> {result['latency_ms']['p50']:>10.1f}ms  "
+            f"({speedup:.2f}x)  peak RSS {before['peak_rss_mb']:.0f} -> {result['peak_rss_mb']:.0f}MB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the supplier pricing pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000], help="rows per CSV")
+    parser.add_argument("--items", type=int, default=2_000, help="distinct items")
+    parser.add_argument("--suppliers", type=int, default=50, help="distinct suppliers")
+    parser.add_argument("--targets", nargs="+", default=TARGETS, choices=TARGETS)
+    parser.add_argument("--repeats", type=int, default=0, help="runs per case (default scales with size)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs first (worker pool start-up, imports)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
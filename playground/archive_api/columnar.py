@@ -0,0 +1,197 @@
+"""
+Columnar engine for compute_insights.
+
+Parses the CSV into typed columns once and computes min/max/argmin/argmax
+per normalised item key as grouped numpy operations instead of a per-row
+Python loop. The JSON it returns is identical to main.compute_insights.
+
+numpy is required. pyarrow is optional: when installed it is used for the
+CSV parse itself (multi-threaded, dictionary-encoded string columns), which
+is where most of the time goes on large uploads.
+"""
+import csv
+import io
+
+from insights import check_headers, summarise
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this engine needs it
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+
+def _read_header(csv_text: str) -> list:
+    return next(csv.reader(io.StringIO(csv_text)), None)
+
+
+def _read_columns_arrow(csv_text: str, header: list, positions: tuple) -> tuple:
+    names = [str(i) for i in range(len(header))]
+    wanted = [names[p] for p in positions]
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    table = pa_csv.read_csv(
+        pa.py_buffer(csv_text.encode("utf-8")),
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=wanted,
+            column_types={wanted[0]: dictionary, wanted[1]: dictionary, wanted[2]: pa.string()},
+        ),
+    )
+
+    if table.num_rows == 0:
+        return np.empty(0, dtype=np.intp), [], np.empty(0, dtype=np.intp), [], np.empty(0)
+
+    columns = []
+    for name in wanted[:2]:
+        encoded = table.column(name).unify_dictionaries().combine_chunks()
+        columns.append(encoded.indices.to_numpy(zero_copy_only=False).astype(np.intp))
+        columns.append(encoded.dictionary.to_pylist())
+
+    price_text = table.column(wanted[2])
+    try:
+        prices = pa_compute.cast(price_text, pa.float64()).to_numpy()
+    except pa.ArrowInvalid:
+        # Arrow is stricter than float() (e.g. " 3", "1_000"); defer to float()
+        prices = np.fromiter(map(float, price_text.to_pylist()), dtype=np.float64, count=len(price_text))
+    columns.append(prices)
+    return tuple(columns)
+
+
+def _read_columns_csv(csv_text: str, positions: tuple) -> tuple:
+    reader = csv.reader(io.StringIO(csv_text))
+    next(reader)
+    rows = [row for row in reader if row]
+    item_col, supplier_col, price_col = positions
+
+    columns = []
+    try:
+        for col in (item_col, supplier_col):
+            values = [row[col] for row in rows]
+            uniques = list(dict.fromkeys(values))
+            code = {raw: i for i, raw in enumerate(uniques)}
+            columns.append(np.fromiter(map(code.__getitem__, values), dtype=np.intp, count=len(values)))
+            columns.append(uniques)
+        columns.append(np.fromiter(map(float, (row[price_col] for row in rows)), dtype=np.float64, count=len(rows)))
+    except IndexError:
+        raise ValueError("Every row must have item, supplier and price values")
+    return tuple(columns)
+
+
+def group_codes(raw_codes, raw_values: list, normalise) -> tuple:
+    """
+    Collapse raw string codes into normalised key codes. Key codes are
+    assigned in order of first appearance in the file, which keeps the
+    output dict order the same as the row-by-row engine.
+    Returns: (key code per row, list of keys indexed by key code)
+    """
+    n = len(raw_codes)
+    first_seen = np.full(len(raw_values), n, dtype=np.intp)
+    np.minimum.at(first_seen, raw_codes, np.arange(n, dtype=np.intp))
+
+    keys: list = []
+    key_code: dict = {}
+    raw_to_key = np.zeros(len(raw_values), dtype=np.intp)
+    for raw_i in np.argsort(first_seen, kind="stable").tolist():
+        if first_seen[raw_i] == n:
+            break  # dictionary entries that no row references
+        key = normalise(raw_values[raw_i])
+        if key not in key_code:
+            key_code[key] = len(keys)
+            keys.append(key)
+        raw_to_key[raw_i] = key_code[key]
+
+    return raw_to_key[raw_codes], keys
+
+
+def _arg_extreme(group, prices, n_groups: int, first_row, ufunc):
+    """
+    Row index of the extreme price per group (ufunc is np.fmin or np.fmax).
+    Ties resolve to the earliest row, and a group whose first row is NaN
+    keeps that row, matching the strict < / > comparisons in the
+    row-by-row engine.
+    """
+    extreme = np.full(n_groups, np.nan)
+    ufunc.at(extreme, group, prices)
+
+    candidates = np.flatnonzero(prices == extreme[group])
+    arg = np.full(n_groups, len(prices), dtype=np.intp)
+    np.minimum.at(arg, group[candidates], candidates)
+
+    nan_first = np.isnan(prices[first_row])
+    arg[nan_first] = first_row[nan_first]
+    return arg
+
+
+def normalise_item(raw: str) -> str:
+    # Normalise item key to prevent duplicates like "Olive Oil" vs "olive oil"
+    return raw.strip().lower()
+
+
+def read_columns(csv_text: str) -> tuple:
+    """
+    Parse a CSV into normalised columns.
+    Returns: (item code per row, item keys, supplier code per row,
+              supplier names, prices), codes in order of first appearance
+    """
+    header = _read_header(csv_text)
+    check_headers(header)
+
+    # Last occurrence wins for duplicate header names, as with csv.DictReader
+    position = {name: i for i, name in enumerate(header)}
+    positions = (position["item"], position["supplier"], position["price"])
+
+    columns = None
+    if pa is not None:
+        try:
+            columns = _read_columns_arrow(csv_text, header, positions)
+        except pa.ArrowInvalid:
+            columns = None  # ragged rows or quoted newlines; use the csv module
+    if columns is None:
+        columns = _read_columns_csv(csv_text, positions)
+    item_codes, item_values, supplier_codes, supplier_values, prices = columns
+    if not np.isfinite(prices).all():
+        raise ValueError("price must be a finite number")
+
+    if not len(prices):
+        return item_codes, [], supplier_codes, [], prices
+    item_group, item_keys = group_codes(item_codes, item_values, normalise_item)
+    supplier_group, supplier_names = group_codes(supplier_codes, supplier_values, str.strip)
+    return item_group, item_keys, supplier_group, supplier_names, prices
+
+
+def insights_from_columns(item_group, item_keys: list, supplier_group, supplier_names: list, prices) -> dict:
+    """compute_insights over columns shaped like read_columns returns."""
+    min_per_item = {}
+    max_per_item = {}
+
+    if len(prices):
+        n_groups = len(item_keys)
+        first_row = np.full(n_groups, len(prices), dtype=np.intp)
+        np.minimum.at(first_row, item_group, np.arange(len(prices), dtype=np.intp))
+
+        argmin = _arg_extreme(item_group, prices, n_groups, first_row, np.fmin)
+        argmax = _arg_extreme(item_group, prices, n_groups, first_row, np.fmax)
+
+        min_suppliers = supplier_group[argmin].tolist()
+        max_suppliers = supplier_group[argmax].tolist()
+        min_prices = prices[argmin].tolist()
+        max_prices = prices[argmax].tolist()
+
+        for i, item_key in enumerate(item_keys):
+            min_per_item[item_key] = {"supplier": supplier_names[min_suppliers[i]], "price": min_prices[i]}
+            max_per_item[item_key] = {"supplier": supplier_names[max_suppliers[i]], "price": max_prices[i]}
+
+    return summarise(min_per_item, max_per_item)
+
+
+def compute_insights_columnar(csv_text: str) -> dict:
+    if np is None:
+        raise RuntimeError("The columnar engine requires numpy (pip install numpy)")
+
+    return insights_from_columns(*read_columns(csv_text))
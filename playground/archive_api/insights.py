@@ -0,0 +1,129 @@
+"""
+Shared pieces of the insight computation used by every engine.
+"""
+import csv
+import io
+import math
+
+REQUIRED_HEADERS = {"item", "supplier", "price"}
+
+
+def check_headers(fieldnames) -> None:
+    if fieldnames is None or not REQUIRED_HEADERS.issubset(set(fieldnames)):
+        raise KeyError(f"CSV must include headers: {sorted(REQUIRED_HEADERS)}")
+
+
+class InsightAccumulator:
+    """
+    Running per-item min/max that rows can be folded into one at a time,
+    so callers never need the whole CSV in memory.
+    """
+
+    def __init__(self):
+        self.min_per_item = {}
+        self.max_per_item = {}
+        self.rows = 0
+
+    def add_rows(self, rows) -> None:
+        """Fold csv.DictReader rows into the running min/max."""
+        min_per_item = self.min_per_item
+        max_per_item = self.max_per_item
+        count = 0
+
+        for count, row in enumerate(rows, start=1):
+            item_raw = row["item"]
+            supplier = row["supplier"].strip()
+            price = float(row["price"])
+            if not math.isfinite(price):
+                raise ValueError(f"price '{row['price']}' is not a finite number")
+
+            # Normalise item key to prevent duplicates like "Olive Oil" vs "olive oil"
+            item_key = item_raw.strip().lower()
+
+            if item_key not in min_per_item or price < min_per_item[item_key]["price"]:
+                min_per_item[item_key] = {"supplier": supplier, "price": price}
+
+            if item_key not in max_per_item or price > max_per_item[item_key]["price"]:
+                max_per_item[item_key] = {"supplier": supplier, "price": price}
+
+        self.rows += count
+
+    def merge(self, other: "InsightAccumulator") -> None:
+        """
+        Fold another accumulator in, as if its rows came after ours.
+        Same strict < / > rule as add_rows, so earlier batches win ties.
+        """
+        for item_key, cheap in other.min_per_item.items():
+            if item_key not in self.min_per_item or cheap["price"] < self.min_per_item[item_key]["price"]:
+                self.min_per_item[item_key] = dict(cheap)
+
+        for item_key, expensive in other.max_per_item.items():
+            if item_key not in self.max_per_item or expensive["price"] > self.max_per_item[item_key]["price"]:
+                self.max_per_item[item_key] = dict(expensive)
+
+        self.rows += other.rows
+
+    def result(self) -> dict:
+        return summarise(self.min_per_item, self.max_per_item)
+
+    def to_dict(self) -> dict:
+        return {"rows": self.rows, "min_per_item": self.min_per_item, "max_per_item": self.max_per_item}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InsightAccumulator":
+        acc = cls()
+        acc.rows = data.get("rows", 0)
+        acc.min_per_item = data.get("min_per_item", {})
+        acc.max_per_item = data.get("max_per_item", {})
+        return acc
+
+
+def accumulate_csv(csv_text: str) -> InsightAccumulator:
+    """Parse one CSV into an accumulator (picklable, for worker processes)."""
+    reader = csv.DictReader(io.StringIO(csv_text))
+    check_headers(reader.fieldnames)
+
+    acc = InsightAccumulator()
+    acc.add_rows(reader)
+    return acc
+
+
+def summarise(min_per_item: dict, max_per_item: dict) -> dict:
+    """
+    Build the /cheapest response from the per-item min and max.
+    Both dicts map item_key -> {"supplier": str, "price": float} and must
+    share insertion order, which fixes float summation order.
+    """
+    # Totals + savings
+    total_min = round(sum(v["price"] for v in min_per_item.values()), 2)
+    total_max = round(sum(v["price"] for v in max_per_item.values()), 2)
+    total_savings = round(total_max - total_min, 2)
+
+    savings_by_item = {}
+    supplier_wins = {}
+    supplier_spend = {}
+
+    for item_key, cheap in min_per_item.items():
+        expensive = max_per_item[item_key]
+        savings = round(expensive["price"] - cheap["price"], 2)
+
+        savings_by_item[item_key] = {
+            "cheapest_supplier": cheap["supplier"],
+            "cheapest_price": round(cheap["price"], 2),
+            "most_expensive_supplier": expensive["supplier"],
+            "most_expensive_price": round(expensive["price"], 2),
+            "savings": savings,
+        }
+
+        s = cheap["supplier"]
+        supplier_wins[s] = supplier_wins.get(s, 0) + 1
+        supplier_spend[s] = round(supplier_spend.get(s, 0.0) + cheap["price"], 2)
+
+    return {
+        "cheapest": min_per_item,
+        "total_cheapest": total_min,
+        "total_most_expensive": total_max,
+        "total_savings": total_savings,
+        "savings_by_item": savings_by_item,
+        "supplier_scoreboard": {"wins": supplier_wins, "spend": supplier_spend},
+    }
@@ -1,9 +1,57 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Optional
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import asyncio
+import codecs
 import csv
-import io
+import logging
+import os
+import shutil
+import tempfile
+
+from columnar import compute_insights_columnar
+from insights import InsightAccumulator, accumulate_csv, check_headers
+from price_index import PriceIndex
+from price_store import read_rows, store_from_env
+from price_trends import price_trends
+from result_cache import ResultCache, content_key, file_key
+from worker_pool import InsightPool, PoolFullError
+
+logger = logging.getLogger(__name__)
+
+# Insight computation runs in worker processes so one large CSV can't
+# block other requests. Configure with INSIGHT_WORKERS, INSIGHT_QUEUE_SIZE
+# and INSIGHT_JOB_TIMEOUT (seconds).
+insight_pool = InsightPool.from_env()
+
+# Repeat uploads of the same CSV are served from here. Configure with
+# INSIGHT_CACHE_SIZE (entries) and INSIGHT_CACHE_TTL (seconds).
+result_cache = ResultCache.from_env()
+
+# Running min/max per item across every invoice batch applied through
+# /index. Persisted to PRICE_INDEX_PATH.
+price_index = PriceIndex.from_env()
+
+# Every invoice row parsed by the API is kept in a month-partitioned
+# columnar store under PRICE_STORE_DIR (set it to "" to disable).
+price_store = store_from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    insight_pool.shutdown()
+
 
-app = FastAPI(title="Supplier Price API", version="0.2.0")
+app = FastAPI(title="Supplier Price API", version="0.2.0", lifespan=lifespan)
+
+# Bytes read from an upload per step in streaming mode
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 
 class CSVPayload(BaseModel):
@@ -15,70 +63,164 @@ def health_check():
     return {"status": "API is running"}
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    return result_cache.stats()
+
+
+@app.delete("/cache")
+def clear_cache():
+    result_cache.clear()
+    return {"status": "cache cleared"}
+
+
 def compute_insights(csv_text: str) -> dict:
-    f = io.StringIO(csv_text)
-    reader = csv.DictReader(f)
+    return accumulate_csv(csv_text).result()
+
+
+def iter_upload_lines(binary_file, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """
+    Decode a binary file incrementally and yield lines as io.StringIO would,
+    splitting on "\n" only. At most one chunk plus one partial line is
+    held in memory at a time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in iter(lambda: binary_file.read(chunk_size), b""):
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def compute_insights_stream(binary_file) -> dict:
+    """Same result as compute_insights, folding rows in as the file is read."""
+    reader = csv.DictReader(iter_upload_lines(binary_file))
+    check_headers(reader.fieldnames)
+
+    insights = InsightAccumulator()
+    insights.add_rows(reader)
+    return insights.result()
 
-    required = {"item", "supplier", "price"}
-    if reader.fieldnames is None or not required.issubset(set(reader.fieldnames)):
-        raise KeyError(f"CSV must include headers: {sorted(required)}")
 
-    min_per_item = {}
-    max_per_item = {}
+def stream_upload_job(path: str, insights: bool, history: bool) -> tuple:
+    """
+    Worker job for a spooled stream=true upload.
+    Returns: (insights or None, price store columns or None, history error or None).
+    Bad rows fail the insights; when only the history can't take them the
+    error is returned instead, so it never fails the upload.
+    """
+    result = columns = error = None
+    with open(path, "rb") as f:
+        if insights:
+            result = compute_insights_stream(f)
+        if history:
+            f.seek(0)
+            try:
+                columns = read_rows(csv.DictReader(iter_upload_lines(f)))
+            except (KeyError, ValueError) as e:
+                error = str(e)
+    return result, columns, error
 
-    for row in reader:
-        item_raw = row["item"]
-        supplier = row["supplier"].strip()
-        price = float(row["price"])
 
-        # Normalise item key to prevent duplicates like "Olive Oil" vs "olive oil"
-        item_key = item_raw.strip().lower()
+def spool_upload(binary_file) -> str:
+    """Copy an upload to a temporary file a worker process can open; returns its path."""
+    binary_file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="upload-", suffix=".csv", delete=False) as f:
+        shutil.copyfileobj(binary_file, f, UPLOAD_CHUNK_SIZE)
+        return f.name
 
-        if item_key not in min_per_item or price < min_per_item[item_key]["price"]:
-            min_per_item[item_key] = {"supplier": supplier, "price": price}
 
-        if item_key not in max_per_item or price > max_per_item[item_key]["price"]:
-            max_per_item[item_key] = {"supplier": supplier, "price": price}
+async def run_stream_in_pool(binary_file, insights: bool, history: bool) -> tuple:
+    """
+    stream_upload_job in the worker pool, under the same admission and
+    timeout as every other insight job.
+    """
+    path = await run_in_threadpool(spool_upload, binary_file)
+    try:
+        return await run_in_pool(stream_upload_job, path, insights, history)
+    finally:
+        os.unlink(path)
+
+
+# "python" is the row-by-row reference engine; "columnar" gives identical
+# results using grouped numpy operations and is much faster on large files.
+ENGINES = {
+    "python": compute_insights,
+    "columnar": compute_insights_columnar,
+}
+
+
+def get_engine(engine: str):
+    if engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown engine '{engine}'. Use one of: {sorted(ENGINES)}")
+    return ENGINES[engine]
+
+
+async def run_in_pool(fn, *args):
+    """Run fn in the worker pool, mapping pool failures to HTTP errors."""
+    try:
+        return await insight_pool.run(fn, *args)
+    except PoolFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Insight job exceeded {insight_pool.timeout:g}s")
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Insight worker crashed, please retry")
+
+
+async def run_engine(engine: str, csv_text: str) -> dict:
+    compute = get_engine(engine)
+    try:
+        return await run_in_pool(compute, csv_text)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
 
-    # Totals + savings
-    total_min = round(sum(v["price"] for v in min_per_item.values()), 2)
-    total_max = round(sum(v["price"] for v in max_per_item.values()), 2)
-    total_savings = round(total_max - total_min, 2)
+async def cached(key: str, compute) -> dict:
+    """Serve key from the result cache, or await compute() and store it."""
+    result = result_cache.get(key)
+    if result is None:
+        result = await compute()
+        result_cache.put(key, result)
+    return result
 
-    savings_by_item = {}
-    supplier_wins = {}
-    supplier_spend = {}
 
-    for item_key, cheap in min_per_item.items():
-        expensive = max_per_item[item_key]
-        savings = round(expensive["price"] - cheap["price"], 2)
+def record_history(key: str, csv_text: str, ingest_date: Optional[date] = None) -> int:
+    """Keep the rows of a parsed CSV in the price store, if it is enabled."""
+    if price_store is None:
+        return 0
+    return price_store.append_csv(key, csv_text, ingest_date or date.today())
 
-        savings_by_item[item_key] = {
-            "cheapest_supplier": cheap["supplier"],
-            "cheapest_price": round(cheap["price"], 2),
-            "most_expensive_supplier": expensive["supplier"],
-            "most_expensive_price": round(expensive["price"], 2),
-            "savings": savings,
-        }
 
-        s = cheap["supplier"]
-        supplier_wins[s] = supplier_wins.get(s, 0) + 1
-        supplier_spend[s] = round(supplier_spend.get(s, 0.0) + cheap["price"], 2)
+def record_history_columns(key: str, columns: tuple) -> int:
+    """Background task for stream=true uploads; failures are logged, not raised."""
+    try:
+        return price_store.append_columns(key, columns, date.today())
+    except (OSError, ValueError):
+        logger.exception("Could not record price history for upload %s", key)
+        return 0
 
-    return {
-        "cheapest": min_per_item,
-        "total_cheapest": total_min,
-        "total_most_expensive": total_max,
-        "total_savings": total_savings,
-        "savings_by_item": savings_by_item,
-        "supplier_scoreboard": {"wins": supplier_wins, "spend": supplier_spend},
-    }
+
+def require_store():
+    if price_store is None:
+        raise HTTPException(status_code=501, detail="Price history is disabled (set PRICE_STORE_DIR and install numpy)")
+    return price_store
 
 
 @app.post("/cheapest")
-def cheapest(payload: CSVPayload):
+async def cheapest(payload: CSVPayload, background_tasks: BackgroundTasks, engine: str = "python"):
     try:
-        return compute_insights(payload.csv_text)
+        get_engine(engine)
+        csv_text = payload.csv_text
+        key = content_key(csv_text.encode("utf-8"))
+        result = await cached(key, lambda: run_engine(engine, csv_text))
+        background_tasks.add_task(record_history, key, csv_text)
+        return result
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ValueError:
@@ -86,11 +228,136 @@ def cheapest(payload: CSVPayload):
 
 
 @app.post("/upload")
-async def upload(file: UploadFile = File(...)):
+async def upload(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    engine: str = "python",
+    stream: bool = False,
+):
+    try:
+        get_engine(engine)
+        if stream:
+            # Constant memory per request: the upload is spooled to disk and
+            # a worker streams it from there
+            if engine != "python":
+                raise HTTPException(status_code=400, detail="stream=true only supports engine=python")
+            key = await run_in_threadpool(file_key, file.file)
+            result = result_cache.get(key)
+            history = price_store is not None and not price_store.has_batch(key)
+            if result is None or history:
+                # One worker pass gives the insights and the history columns
+                computed, columns, error = await run_stream_in_pool(file.file, result is None, history)
+                if result is None:
+                    result = computed
+                    result_cache.put(key, result)
+                if error:
+                    logger.warning("Price history skipped for upload %s: %s", key, error)
+                elif columns is not None:
+                    background_tasks.add_task(record_history_columns, key, columns)
+            return result
+
+        content = await file.read()
+        key = content_key(content)
+        result = await cached(key, lambda: run_engine(engine, content.decode("utf-8")))
+        background_tasks.add_task(record_history, key, content.decode("utf-8"))
+        return result
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be a UTF-8 CSV")
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Price must be numeric")
+
+
+async def apply_index_batch(csv_text: str, background_tasks: BackgroundTasks) -> dict:
+    batch = await run_in_pool(accumulate_csv, csv_text)
+    stats = await run_in_threadpool(price_index.apply, batch)
+    background_tasks.add_task(record_history, content_key(csv_text.encode("utf-8")), csv_text)
+    return stats
+
+
+@app.get("/index")
+def index_insights():
+    return price_index.insights()
+
+
+@app.get("/index/stats")
+def index_stats():
+    return price_index.stats()
+
+
+@app.post("/index/batches")
+async def index_batch(payload: CSVPayload, background_tasks: BackgroundTasks):
+    try:
+        return await apply_index_batch(payload.csv_text, background_tasks)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Price must be numeric")
+
+
+@app.post("/index/upload")
+async def index_upload(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    try:
+        content = await file.read()
+        return await apply_index_batch(content.decode("utf-8"), background_tasks)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be a UTF-8 CSV")
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Price must be numeric")
+
+
+@app.delete("/index")
+def reset_index():
+    price_index.reset()
+    return {"status": "index reset"}
+
+
+@app.get("/history/insights")
+def history_insights(start: Optional[date] = None, end: Optional[date] = None):
+    """compute_insights over every invoice row ingested between start and end."""
+    return require_store().insights(start, end)
+
+
+@app.get("/history/trends")
+def history_trends(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    period: str = "week",
+    window: int = 4,
+    top: int = 10,
+    item: Optional[str] = None,
+):
+    """
+    Per-item and per-supplier price trends over the stored history: rolling
+    averages, percentiles, volatility and the biggest movers. Pass item to
+    get that item's per-period series as well.
+    """
+    store = require_store()
+    try:
+        return price_trends(store.read(start, end), store.strings, period=period, window=window, top=top, item=item)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/history/stats")
+def history_stats():
+    return require_store().stats()
+
+
+@app.post("/history/upload")
+async def history_upload(file: UploadFile = File(...), ingest_date: Optional[date] = None):
+    """Backfill the price history with an invoice, optionally dated in the past."""
+    store = require_store()
     try:
         content = await file.read()
-        csv_text = content.decode("utf-8")
-        return compute_insights(csv_text)
+        key = content_key(content)
+        rows = await run_in_threadpool(record_history, key, content.decode("utf-8"), ingest_date)
+        return {"rows_written": rows, "already_ingested": rows == 0 and store.has_batch(key)}
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be a UTF-8 CSV")
     except KeyError as e:
@@ -0,0 +1,68 @@
+"""
+Persistent, mergeable per-item price index.
+
+Invoices arrive as daily deltas. Each batch is folded into a per-item
+min/max (supplier and price per normalised item key) that is saved to
+disk, so the cheapest/savings/scoreboard view is served in O(items)
+without reprocessing history.
+"""
+import json
+import os
+import threading
+
+from insights import InsightAccumulator, summarise
+
+
+class PriceIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self.batches = 0
+        self._prices = InsightAccumulator()
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> "PriceIndex":
+        return cls(os.environ.get("PRICE_INDEX_PATH", "price_index.json"))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        self.batches = data.get("batches", 0)
+        self._prices = InsightAccumulator.from_dict(data)
+
+    def _save(self) -> None:
+        # Write to a temp file and rename so a crash never leaves half a file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"batches": self.batches, **self._prices.to_dict()}, f)
+        os.replace(tmp_path, self.path)
+
+    def apply(self, batch: InsightAccumulator) -> dict:
+        """Merge one parsed batch into the index and persist it."""
+        with self._lock:
+            self._prices.merge(batch)
+            self.batches += 1
+            self._save()
+            return self.stats()
+
+    def insights(self) -> dict:
+        """Same shape as compute_insights over every batch applied so far."""
+        with self._lock:
+            return summarise(dict(self._prices.min_per_item), dict(self._prices.max_per_item))
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self._prices.rows,
+            "items": len(self._prices.min_per_item),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.batches = 0
+            self._prices = InsightAccumulator()
+            if os.path.exists(self.path):
+                os.remove(self.path)
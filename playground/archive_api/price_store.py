@@ -0,0 +1,244 @@
+"""
+Append-only, month-partitioned columnar store of invoice history.
+
+Layout under the store root:
+    strings.jsonl        item keys and supplier names, one JSON string per
+                         line; the line number is the string's code
+    batches.jsonl        one line per ingested CSV (content key, date, rows)
+    2026-10/item.i4      item code per row
+    2026-10/supplier.i4  supplier code per row
+    2026-10/price.f8     price per row
+    2026-10/day.i4       ingest date per row, as days since 1970-01-01
+
+Columns are raw little-endian arrays. Appends go to the end of each file
+and reads use numpy.memmap, so a query only pages in the months it covers.
+A single API process is expected to own the store.
+"""
+import json
+import math
+import os
+import threading
+from array import array
+from datetime import date
+
+from columnar import group_codes, insights_from_columns, normalise_item, np, read_columns
+
+COLUMNS = {"item": "<i4", "supplier": "<i4", "price": "<f8", "day": "<i4"}
+EPOCH = date(1970, 1, 1)
+
+
+def day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def read_rows(rows) -> tuple:
+    """
+    read_columns for csv.DictReader rows, parsed one row at a time into
+    compact arrays. Every row is checked before anything is returned.
+    """
+    item_code, supplier_code = {}, {}
+    items, suppliers, prices = array("q"), array("q"), array("d")
+    for row in rows:
+        items.append(item_code.setdefault(normalise_item(row["item"]), len(item_code)))
+        suppliers.append(supplier_code.setdefault(row["supplier"].strip(), len(supplier_code)))
+        price = float(row["price"])
+        if not math.isfinite(price):
+            raise ValueError(f"price '{row['price']}' is not a finite number")
+        prices.append(price)
+    return (np.frombuffer(items, dtype=np.int64).astype(np.intp), list(item_code),
+            np.frombuffer(suppliers, dtype=np.int64).astype(np.intp), list(supplier_code),
+            np.frombuffer(prices, dtype=np.float64))
+
+
+class PriceStore:
+    def __init__(self, root: str):
+        if np is None:
+            raise RuntimeError("The price history store requires numpy (pip install numpy)")
+        self.root = root
+        self._strings = []
+        self._string_code = {}
+        self._batches = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @property
+    def _strings_path(self) -> str:
+        return os.path.join(self.root, "strings.jsonl")
+
+    @property
+    def _batches_path(self) -> str:
+        return os.path.join(self.root, "batches.jsonl")
+
+    def _load(self) -> None:
+        if os.path.exists(self._strings_path):
+            with open(self._strings_path, "r") as f:
+                for line in f:
+                    value = json.loads(line)
+                    self._string_code[value] = len(self._strings)
+                    self._strings.append(value)
+        if os.path.exists(self._batches_path):
+            with open(self._batches_path, "r") as f:
+                for line in f:
+                    batch = json.loads(line)
+                    self._batches[batch["key"]] = batch
+
+    def _codes_for(self, values: list):
+        """Global string code for each value, registering new strings."""
+        new = [v for v in dict.fromkeys(values) if v not in self._string_code]
+        if new:
+            with open(self._strings_path, "a") as f:
+                for value in new:
+                    f.write(json.dumps(value) + "\n")
+                    self._string_code[value] = len(self._strings)
+                    self._strings.append(value)
+        return np.array([self._string_code[v] for v in values], dtype=np.int32)
+
+    @property
+    def strings(self) -> list:
+        """Item keys and supplier names, indexed by the codes in read()."""
+        return self._strings
+
+    def has_batch(self, key: str) -> bool:
+        return key in self._batches
+
+    def _write(self, ingest_date: date, item_group, item_keys, supplier_group, supplier_names, prices) -> int:
+        if not len(prices):
+            return 0
+        # nan / inf parse as floats but would poison every query over the
+        # partition, and appended rows are never rewritten
+        if not np.isfinite(prices).all():
+            raise ValueError("price must be a finite number")
+        partition = os.path.join(self.root, ingest_date.strftime("%Y-%m"))
+        os.makedirs(partition, exist_ok=True)
+        columns = {
+            "item": self._codes_for(item_keys)[item_group],
+            "supplier": self._codes_for(supplier_names)[supplier_group],
+            "price": prices,
+            "day": np.full(len(prices), day_number(ingest_date)),
+        }
+        paths = {name: os.path.join(partition, f"{name}.{dtype[1:]}") for name, dtype in COLUMNS.items()}
+        sizes = {name: os.path.getsize(path) if os.path.exists(path) else 0 for name, path in paths.items()}
+        try:
+            for name, dtype in COLUMNS.items():
+                with open(paths[name], "ab") as f:
+                    np.asarray(columns[name], dtype=dtype).tofile(f)
+        except BaseException:
+            # All or nothing: cut every column back to where this batch began
+            for name, path in paths.items():
+                if os.path.exists(path):
+                    os.truncate(path, sizes[name])
+            raise
+        return len(prices)
+
+    def _log_batch(self, key: str, ingest_date: date, rows: int) -> dict:
+        batch = {"key": key, "ingest_date": ingest_date.isoformat(), "rows": rows}
+        with open(self._batches_path, "a") as f:
+            f.write(json.dumps(batch) + "\n")
+        self._batches[key] = batch
+        return batch
+
+    def append_columns(self, key: str, columns: tuple, ingest_date: date) -> int:
+        """
+        Ingest parsed columns, shaped like read_columns returns, under
+        ingest_date as one batch. Batches already ingested (same content
+        key) are skipped so repeat uploads don't double count.
+        Returns: rows written
+        """
+        with self._lock:
+            if self.has_batch(key):
+                return 0
+            rows = self._write(ingest_date, *columns)
+            self._log_batch(key, ingest_date, rows)
+            return rows
+
+    def append_csv(self, key: str, csv_text: str, ingest_date: date) -> int:
+        """Ingest every row of a CSV under ingest_date (see append_columns)."""
+        if self.has_batch(key):
+            return 0
+        return self.append_columns(key, read_columns(csv_text), ingest_date)
+
+    def append_rows(self, key: str, rows, ingest_date: date) -> int:
+        """append_csv for csv.DictReader rows."""
+        if self.has_batch(key):
+            return 0
+        return self.append_columns(key, read_rows(rows), ingest_date)
+
+    def _partitions(self, start: date = None, end: date = None) -> list:
+        months = sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+        if start is not None:
+            months = [m for m in months if m >= start.strftime("%Y-%m")]
+        if end is not None:
+            months = [m for m in months if m <= end.strftime("%Y-%m")]
+        return months
+
+    def _map_partition(self, month: str) -> dict:
+        paths = {name: os.path.join(self.root, month, f"{name}.{dtype[1:]}") for name, dtype in COLUMNS.items()}
+        # A crash between column appends can leave one column longer than
+        # the others; only rows present in every column are visible.
+        rows = min(
+            os.path.getsize(paths[name]) // np.dtype(dtype).itemsize if os.path.exists(paths[name]) else 0
+            for name, dtype in COLUMNS.items()
+        )
+        if rows == 0:
+            return {}
+        return {name: np.memmap(paths[name], dtype=dtype, mode="r", shape=(rows,)) for name, dtype in COLUMNS.items()}
+
+    def read(self, start: date = None, end: date = None) -> dict:
+        """
+        Columns for rows ingested between start and end (inclusive).
+        Returns: {"item": codes, "supplier": codes, "price": floats, "day": ints}
+        """
+        lo = day_number(start) if start is not None else None
+        hi = day_number(end) if end is not None else None
+        parts = {name: [] for name in COLUMNS}
+
+        for month in self._partitions(start, end):
+            mapped = self._map_partition(month)
+            if not mapped:
+                continue
+            # Months wholly inside the range are used as-is (no copy)
+            first_day = day_number(date(int(month[:4]), int(month[5:]), 1))
+            next_month = date(int(month[:4]) + int(month[5:]) // 12, int(month[5:]) % 12 + 1, 1)
+            mask = None
+            if lo is not None and first_day < lo:
+                mask = mapped["day"] >= lo
+            if hi is not None and day_number(next_month) - 1 > hi:
+                mask = mapped["day"] <= hi if mask is None else mask & (mapped["day"] <= hi)
+            for name in COLUMNS:
+                parts[name].append(mapped[name] if mask is None else mapped[name][mask])
+
+        return {
+            name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def insights(self, start: date = None, end: date = None) -> dict:
+        """compute_insights over every row ingested between start and end."""
+        columns = self.read(start, end)
+        item_group, item_keys = group_codes(columns["item"], self._strings, str)
+        supplier_group, supplier_names = group_codes(columns["supplier"], self._strings, str)
+        return insights_from_columns(item_group, item_keys, supplier_group, supplier_names, columns["price"])
+
+    def stats(self) -> dict:
+        partitions = {}
+        for month in self._partitions():
+            mapped = self._map_partition(month)
+            partitions[month] = len(mapped["price"]) if mapped else 0
+        return {
+            "batches": len(self._batches),
+            "rows": sum(partitions.values()),
+            "strings": len(self._strings),
+            "partitions": partitions,
+        }
+
+
+def store_from_env():
+    """PriceStore at PRICE_STORE_DIR, or None when disabled or numpy is missing."""
+    root = os.environ.get("PRICE_STORE_DIR", "price_history")
+    if not root or np is None:
+        return None
+    return PriceStore(root)
@@ -0,0 +1,284 @@
+"""
+Price trend and volatility analytics over the stored invoice history.
+
+Rows from price_store are bucketed into periods (day, week or month) and
+aggregated per item with bincount-style grouped reductions, so a query is
+a handful of passes over the columns rather than a Python loop per row.
+
+Per item:
+    latest_avg     mean price in the last period the item was seen
+    rolling_avg    mean price over the last `window` periods
+    change_pct     first observed period mean -> last observed period mean
+    volatility     standard deviation of period-over-period % changes
+    p10/p50/p90    percentiles of every price paid in the date range
+"""
+import math
+from datetime import timedelta
+
+from columnar import np
+from price_store import EPOCH
+
+PERIODS = ("day", "week", "month")
+PERCENTILES = (10, 50, 90)
+# Largest items x periods grid aggregated in one go (~8 bytes per cell each
+# for sums and counts); past this, ask for a coarser period or date range.
+MAX_CELLS = 20_000_000
+
+
+def _bucket(days, period: str):
+    """Period number per row: days, Monday-based weeks or calendar months since 1970."""
+    if period == "day":
+        return days.astype(np.int64)
+    if period == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        weeks = days.astype(np.int64)
+        weeks += 3
+        weeks //= 7
+        return weeks
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _period_label(bucket: int, period: str) -> str:
+    if period == "day":
+        return (EPOCH + timedelta(days=bucket)).isoformat()
+    if period == "week":
+        return (EPOCH + timedelta(days=bucket * 7 - 3)).isoformat()
+    return f"{1970 + bucket // 12:04d}-{bucket % 12 + 1:02d}"
+
+
+def _round(values, digits: int = 2) -> list:
+    """Rounded floats, with None for nan and inf (neither is valid JSON)."""
+    return [round(v, digits) if math.isfinite(v) else None for v in values.tolist()]
+
+
+def _dense_codes(codes, strings: list) -> tuple:
+    """
+    Renumber store string codes to 0..n-1 over the codes actually present.
+    Returns: (dense code per row, strings indexed by dense code)
+    """
+    present = np.bincount(codes, minlength=len(strings)) > 0
+    renumber = np.cumsum(present) - 1
+    return renumber[codes], [strings[i] for i in np.flatnonzero(present).tolist()]
+
+
+def _period_means(group, n_groups: int, period_idx, n_periods: int, prices) -> tuple:
+    """(sum, count) matrices of shape (n_groups, n_periods)."""
+    cell = group * n_periods
+    cell += period_idx
+    size = n_groups * n_periods
+    sums = np.bincount(cell, weights=prices, minlength=size).reshape(n_groups, n_periods)
+    counts = np.bincount(cell, minlength=size).reshape(n_groups, n_periods)
+    return sums, counts
+
+
+def _distinct_per_group(group, n_groups: int, values, n_values: int) -> list:
+    """Number of distinct values per group."""
+    if n_groups * n_values <= MAX_CELLS:
+        present = np.bincount(group * n_values + values, minlength=n_groups * n_values) > 0
+        return present.reshape(n_groups, n_values).sum(axis=1).tolist()
+    pairs = np.unique(group * n_values + values)
+    return np.bincount(pairs // n_values, minlength=n_groups).tolist()
+
+
+# Bits of the (group, price in cents) sort key given to the price
+PRICE_BITS = 40
+
+
+def _percentiles(group, n_groups: int, prices, quantiles) -> dict:
+    """
+    Linear-interpolated percentiles per group, from one sort of a combined
+    (group, price in cents) integer key instead of a sort per group.
+    Non-finite prices are skipped; a group with no prices left gets NaN.
+    """
+    finite = np.isfinite(prices)
+    if not finite.all():
+        group, prices = group[finite], prices[finite]
+    counts = np.bincount(group, minlength=n_groups)
+    if not len(prices):
+        return {f"p{q}": np.full(n_groups, np.nan) for q in quantiles}
+
+    low, high = float(prices.min()) * 100, float(prices.max()) * 100
+    if high - low < (1 << PRICE_BITS) - 1 and n_groups < 1 << (62 - PRICE_BITS):
+        key = np.rint(prices * 100).astype(np.int64)
+        offset = key.min()
+        key -= offset
+        key |= group << PRICE_BITS
+        key.sort()
+        key &= (1 << PRICE_BITS) - 1
+        sorted_cents = key + offset
+    else:
+        # Spread too wide to pack next to the group: sort on both columns
+        sorted_cents = prices[np.lexsort((prices, group))] * 100
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = len(sorted_cents) - 1
+    result = {}
+    for q in quantiles:
+        position = (counts - 1) * (q / 100)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.ceil(position).astype(np.int64)
+        lo_value = sorted_cents[np.clip(starts + lo, 0, last)]
+        hi_value = sorted_cents[np.clip(starts + hi, 0, last)]
+        values = (lo_value + (hi_value - lo_value) * (position - lo)) / 100
+        result[f"p{q}"] = np.where(counts > 0, values, np.nan)
+    return result
+
+
+def _trend_stats(means, counts, sums, window: int) -> dict:
+    """Per-row stats for a (groups x periods) matrix of period means."""
+    n_groups, n_periods = means.shape
+    seen = counts > 0
+    columns = np.arange(n_periods)
+
+    first = np.argmax(seen, axis=1)
+    last = n_periods - 1 - np.argmax(seen[:, ::-1], axis=1)
+    rows = np.arange(n_groups)
+    first_avg = means[rows, first]
+    last_avg = means[rows, last]
+
+    # Rolling mean over the last `window` periods, weighted by row count
+    start = np.maximum(last - window + 1, 0)
+    cum_sums = np.concatenate((np.zeros((n_groups, 1)), np.cumsum(sums, axis=1)), axis=1)
+    cum_counts = np.concatenate((np.zeros((n_groups, 1)), np.cumsum(counts, axis=1)), axis=1)
+    rolling = (cum_sums[rows, last + 1] - cum_sums[rows, start]) / (cum_counts[rows, last + 1] - cum_counts[rows, start])
+
+    # Period-over-period % change between consecutive observed periods
+    last_seen = np.maximum.accumulate(np.where(seen, columns, -1), axis=1)
+    previous = np.concatenate((np.full((n_groups, 1), -1), last_seen[:, :-1]), axis=1)
+    has_previous = seen & (previous >= 0)
+    previous_mean = means[rows[:, None], np.maximum(previous, 0)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A change from a mean of 0 has no percentage; treat it as unknown
+        has_previous &= previous_mean != 0
+        changes = np.where(has_previous, (means - previous_mean) / previous_mean * 100, np.nan)
+        n_changes = has_previous.sum(axis=1)
+        mean_change = np.nansum(changes, axis=1) / n_changes
+        variance = np.nansum((changes - mean_change[:, None]) ** 2, axis=1) / n_changes
+        change_pct = np.where((last > first) & (first_avg != 0), (last_avg - first_avg) / first_avg * 100, np.nan)
+
+    return {
+        "periods": seen.sum(axis=1),
+        "latest_avg": last_avg,
+        "rolling_avg": rolling,
+        "change_pct": change_pct,
+        "volatility": np.where(n_changes > 0, np.sqrt(variance), np.nan),
+    }
+
+
+def _series(means, counts, sums, window: int, labels: list) -> list:
+    """Per-period series for a single group (1-D rows of the matrices)."""
+    cum_sums = np.concatenate(([0.0], np.cumsum(sums)))
+    cum_counts = np.concatenate(([0], np.cumsum(counts)))
+    series = []
+    for i, label in enumerate(labels):
+        if not counts[i]:
+            continue
+        lo = max(i - window + 1, 0)
+        series.append({
+            "period": label,
+            "rows": int(counts[i]),
+            "avg": round(float(means[i]), 2),
+            "rolling_avg": round(float((cum_sums[i + 1] - cum_sums[lo]) / (cum_counts[i + 1] - cum_counts[lo])), 2),
+        })
+    return series
+
+
+def price_trends(columns: dict, strings: list, period: str = "week", window: int = 4,
+                 top: int = 10, item: str = None) -> dict:
+    """
+    Trend, volatility and biggest-mover analytics over price_store columns.
+    Pass item to also get that item's per-period series.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {list(PERIODS)}")
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if top < 0:
+        raise ValueError("top must be 0 or more")
+
+    # Non-finite prices (stored before ingest rejected them) would turn
+    # every sum and mean they touch into nan/inf, so leave those rows out
+    finite = np.isfinite(columns["price"])
+    if not finite.all():
+        columns = {name: values[finite] for name, values in columns.items()}
+
+    prices = columns["price"]
+    response = {"period": period, "window": window, "rows": int(len(prices)),
+                "items": {}, "suppliers": {}, "biggest_movers": {"risers": [], "fallers": []}}
+    if not len(prices):
+        return response
+
+    # Periods cover every calendar period from the first row to the last,
+    # so rolling windows count calendar periods, not just observed ones
+    # Bucket each distinct day once and look rows up in that table
+    days = columns["day"]
+    first_day = int(days.min())
+    day_buckets = _bucket(np.arange(first_day, int(days.max()) + 1), period)
+    first_bucket = int(day_buckets[0])
+    day_buckets -= first_bucket
+    period_idx = day_buckets[days - first_day]
+    n_periods = int(period_idx.max()) + 1
+    labels = [_period_label(first_bucket + i, period) for i in range(n_periods)]
+
+    # Per item
+    item_group, item_keys = _dense_codes(columns["item"], strings)
+    n_items = len(item_keys)
+    if n_items * n_periods > MAX_CELLS:
+        raise ValueError(f"{n_items} items x {n_periods} {period}s is too many to aggregate; use a coarser period or shorter range")
+    sums, counts = _period_means(item_group, n_items, period_idx, n_periods, prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+    stats = _trend_stats(means, counts, sums, window)
+    stats.update(_percentiles(item_group, n_items, prices, PERCENTILES))
+    item_rows = counts.sum(axis=1)
+
+    rounded = {name: _round(values) for name, values in stats.items() if name != "periods"}
+    periods_seen = stats["periods"].tolist()
+    for i, key in enumerate(item_keys):
+        response["items"][key] = {"rows": int(item_rows[i]), "periods": periods_seen[i],
+                                  **{name: values[i] for name, values in rounded.items()}}
+
+    # Per supplier: a price index of each row against the item's average
+    # over the range (100 = market average), tracked per period
+    item_avg = sums.sum(axis=1) / item_rows
+    index = item_avg[item_group]
+    # Rows of items that only ever cost 0 have no price level to index against
+    priced = index != 0
+    np.divide(prices, index, out=index, where=priced)
+    index *= 100
+    supplier_group, supplier_names = _dense_codes(columns["supplier"], strings)
+    n_suppliers = len(supplier_names)
+    supplier_sums, supplier_counts = _period_means(supplier_group[priced], n_suppliers, period_idx[priced], n_periods, index[priced])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        supplier_stats = _trend_stats(supplier_sums / supplier_counts, supplier_counts, supplier_sums, window)
+    supplier_rounded = {name: _round(values) for name, values in supplier_stats.items() if name != "periods"}
+    supplier_items = _distinct_per_group(supplier_group, n_suppliers, item_group, n_items)
+    supplier_rows = np.bincount(supplier_group, minlength=n_suppliers).tolist()
+    for i, name in enumerate(supplier_names):
+        response["suppliers"][name] = {
+            "rows": supplier_rows[i],
+            "items": supplier_items[i],
+            "price_index": supplier_rounded["latest_avg"][i],
+            "rolling_price_index": supplier_rounded["rolling_avg"][i],
+            "price_index_change_pct": supplier_rounded["change_pct"][i],
+            "volatility": supplier_rounded["volatility"][i],
+        }
+
+    # Biggest movers by first -> last period change
+    change = stats["change_pct"]
+    moved = np.flatnonzero(~np.isnan(change))
+    by_change = moved[np.argsort(change[moved], kind="stable")]
+    risers = [i for i in by_change[::-1][:top].tolist() if change[i] > 0]
+    fallers = [i for i in by_change[:top].tolist() if change[i] < 0]
+    for name, idx in (("risers", risers), ("fallers", fallers)):
+        response["biggest_movers"][name] = [{"item": item_keys[i], "change_pct": rounded["change_pct"][i]} for i in idx]
+
+    if item is not None:
+        key = item.strip().lower()
+        if key not in response["items"]:
+            raise KeyError(f"No price history for item '{item}'")
+        i = item_keys.index(key)
+        response["series"] = _series(means[i], counts[i], sums[i], window, labels)
+
+    return response
+
@@ -0,0 +1,101 @@
+"""
+Content-addressed cache of compute_insights results.
+
+Store managers upload the same supplier invoice many times a day. Results
+are keyed by a SHA-256 of the CSV bytes and kept in an LRU with both an
+entry limit and a TTL.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Bump when the item-key normalisation in insights.InsightAccumulator
+# (currently item.strip().lower()) or the response shape changes, so
+# results computed under the old rule are never served.
+NORMALISATION_VERSION = "item-strip-lower:v1"
+
+
+def content_key(data: bytes) -> str:
+    """Cache key for raw CSV bytes."""
+    digest = hashlib.sha256(NORMALISATION_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def file_key(binary_file, chunk_size: int = 1024 * 1024) -> str:
+    """content_key for a seekable file, hashed in chunks and rewound."""
+    digest = hashlib.sha256(NORMALISATION_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    for chunk in iter(lambda: binary_file.read(chunk_size), b""):
+        digest.update(chunk)
+    binary_file.seek(0)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Args:
+            max_entries: least recently used results are evicted past this
+            ttl: seconds a result stays valid after it was stored
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            max_entries=int(os.environ.get("INSIGHT_CACHE_SIZE", 256)),
+            ttl=float(os.environ.get("INSIGHT_CACHE_TTL", 3600)),
+        )
+
+    def get(self, key: str):
+        """Return the cached result or None, counting a hit or miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, result: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
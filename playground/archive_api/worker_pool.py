@@ -0,0 +1,141 @@
+"""
+Process pool for CPU-bound insight computation.
+
+compute_insights is pure-Python CPU work, so running it on the event loop
+(or in the threadpool, under the GIL) lets one large CSV stall every other
+request. InsightPool runs jobs in worker processes with a bounded number
+of jobs in flight and a per-job timeout.
+
+A worker can't be stopped on its own, so a job that times out while
+running retires its whole pool: new jobs go to a fresh pool, the old one
+finishes the jobs it already has and its processes are then terminated,
+taking the stuck job with them. A timed-out job stops counting against
+the queue as soon as its request gives up.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class PoolFullError(Exception):
+    """Raised when every worker is busy and the queue is full."""
+
+
+class InsightPool:
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        """
+        Args:
+            workers: number of worker processes
+            queue_size: jobs allowed to wait for a free worker
+            timeout: seconds a job may take; past it the request gives up
+                and the job is killed (see the module docstring)
+        """
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._executor = None
+        # executor -> futures still counted in _in_flight, for every pool
+        # that has jobs left (the current one and any retired ones)
+        self._live = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "InsightPool":
+        workers = int(os.environ.get("INSIGHT_WORKERS", os.cpu_count() or 1))
+        return cls(
+            workers=workers,
+            queue_size=int(os.environ.get("INSIGHT_QUEUE_SIZE", workers * 2)),
+            timeout=float(os.environ.get("INSIGHT_JOB_TIMEOUT", 30)),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                raise PoolFullError("Too many insight jobs in progress, try again shortly")
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _finish(self, executor, future) -> None:
+        """Stop counting a job, once: it finished or its request gave up."""
+        with self._lock:
+            live = self._live.get(executor)
+            if live is None or future not in live:
+                return
+            live.discard(future)
+            self._in_flight -= 1
+            reap = executor is not self._executor and not live
+            if reap:
+                del self._live[executor]
+        if reap:
+            _terminate(executor)
+
+    def _retire(self, executor) -> None:
+        """Send new jobs to a fresh pool; executor is terminated when its last counted job is done."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            reap = not self._live.get(executor)
+            if reap:
+                self._live.pop(executor, None)
+        if reap:
+            _terminate(executor)
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in a worker process.
+        Raises PoolFullError when the queue is full and asyncio.TimeoutError
+        when the job takes longer than the timeout.
+        """
+        self._acquire()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._live[self._executor] = set()
+                executor = self._executor
+                future = executor.submit(fn, *args)
+                self._live[executor].add(future)
+        except BaseException:
+            self._release()
+            raise
+
+        future.add_done_callback(lambda done: self._finish(executor, done))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            if not future.cancel():  # only succeeds if the job has not started yet
+                self._finish(executor, future)
+                self._retire(executor)
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool on the next job
+            self._retire(executor)
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            current, retired = self._executor, [e for e in self._live if e is not self._executor]
+            self._executor = None
+            self._live = {}
+        if current is not None:
+            current.shutdown(wait=False, cancel_futures=True)
+        for executor in retired:
+            _terminate(executor)
+
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    """Kill a retired pool's worker processes, including any stuck job."""
+    # ProcessPoolExecutor has no public way to stop a running job
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
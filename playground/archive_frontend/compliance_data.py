@@ -0,0 +1,302 @@
+"""
+Log-structured, concurrency-safe storage for the Waterfront compliance tracker.
+
+Files in the data directory:
+    stores.json               snapshot of stores
+    compliance_records.json   snapshot of compliance records
+    changes.log               one JSON line per add/update/delete since the
+                              last snapshot
+    audit.log                 every change ever made (who, what, when);
+                              compacted log lines are moved here
+    ids.json                  highest id ever handed out, per kind
+    compliance.lock           exclusive lock held by writers
+
+A write appends one line to changes.log under the lock, so it costs the
+same however much history there is. Loading reads the snapshot once and
+then only the log lines it has not seen yet. Every COMPACT_EVERY changes
+the log is folded into a fresh snapshot. Replaying a change twice gives
+the same result, so a crash part-way through compaction loses nothing.
+"""
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# File, export and import helpers are shared with the main tracker; every
+# archive module imports this one first, so this also makes them importable there
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "apps", "compliance_tracker")
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
+from compliance_files import write_json_atomic  # noqa: E402
+
+STORES = "stores"
+RECORDS = "compliance_records"
+COMPACT_EVERY = 1000
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _signature(path: str):
+    try:
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+class ComplianceData:
+    def __init__(self, data_dir: str = ".", compact_every: int = COMPACT_EVERY):
+        self.paths = {
+            STORES: os.path.join(data_dir, "stores.json"),
+            RECORDS: os.path.join(data_dir, "compliance_records.json"),
+        }
+        self.log_path = os.path.join(data_dir, "changes.log")
+        self.audit_path = os.path.join(data_dir, "audit.log")
+        self.ids_path = os.path.join(data_dir, "ids.json")
+        self.lock_path = os.path.join(data_dir, "compliance.lock")
+        self.compact_every = compact_every
+
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._items = {STORES: {}, RECORDS: {}}  # kind -> {id: item}, in insertion order
+        self._max_id = {STORES: 0, RECORDS: 0}
+        self._snapshot = None   # signatures of the snapshot files last loaded
+        self._log_offset = 0    # bytes of changes.log applied so far
+        self._log_entries = 0
+        self._changes = []      # (log offset after entry, entry) since the last full reload
+        self._generation = 0    # bumped on every full reload
+        self._lists = None      # cached load() result
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock across threads and processes for one change."""
+        with self._thread_lock:
+            # Re-entrant: compact() runs inside a write that already holds the file lock
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -- reading -------------------------------------------------------------
+
+    def _apply(self, entry: dict) -> None:
+        items = self._items[entry["kind"]]
+        item_id = entry["id"]
+        if entry["op"] == "add":
+            items[item_id] = entry["data"]
+            self._max_id[entry["kind"]] = max(self._max_id[entry["kind"]], item_id)
+        elif entry["op"] == "update":
+            if item_id in items:
+                items[item_id] = {**items[item_id], **entry["data"]}
+        elif entry["op"] == "delete":
+            items.pop(item_id, None)
+        self._lists = None
+
+    def _reload_snapshot(self, signature) -> None:
+        ids = _read_json(self.ids_path, {})
+        for kind, path in self.paths.items():
+            self._items[kind] = {item["id"]: item for item in _read_json(path, [])}
+            self._max_id[kind] = max([ids.get(kind, 0), *self._items[kind]])
+        self._snapshot = signature
+        self._log_offset = 0
+        self._log_entries = 0
+        self._changes = []
+        self._generation += 1
+        self._lists = None
+
+    def _refresh(self) -> None:
+        """Catch up with the files: full reload after a compaction, else only new log lines."""
+        signature = tuple(_signature(path) for path in (*self.paths.values(), self.ids_path))
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if signature != self._snapshot or log_size < self._log_offset:
+            self._reload_snapshot(signature)
+        if log_size == self._log_offset:
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read(log_size - self._log_offset)
+        # A line still being written has no newline yet; leave it for next time
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        for line in complete.splitlines(keepends=True):
+            self._log_offset += len(line)
+            if line.strip():
+                entry = json.loads(line)
+                self._apply(entry)
+                self._changes.append((self._log_offset, entry))
+                self._log_entries += 1
+
+    def load(self) -> tuple:
+        """(stores, records) as lists. Shared between callers: treat as read-only."""
+        with self._thread_lock:
+            self._refresh()
+            if self._lists is None:
+                self._lists = (list(self._items[STORES].values()), list(self._items[RECORDS].values()))
+            return self._lists
+
+    @property
+    def version(self) -> tuple:
+        """Changes whenever the data does; use as a cache key."""
+        with self._thread_lock:
+            self._refresh()
+            return self._generation, self._log_offset
+
+    def changes_since(self, version: tuple) -> tuple:
+        """
+        (current version, change entries made after `version`), or
+        (current version, None) if the data was reloaded in between and
+        the caller has to start over from load().
+        """
+        with self._thread_lock:
+            self._refresh()
+            current = (self._generation, self._log_offset)
+            if version is None or version[0] != self._generation:
+                return current, None
+            return current, [entry for offset, entry in self._changes if offset > version[1]]
+
+    # -- writing -------------------------------------------------------------
+
+    def _catch_up_for_write(self) -> None:
+        """Call with the lock held, before appending."""
+        self._refresh()
+        # Bytes past what we applied can only be a line from a writer that
+        # crashed mid-append; drop it so the next line starts cleanly
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self._log_offset:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(self._log_offset)
+
+    @staticmethod
+    def _entry(op: str, kind: str, item_id: int, data: dict, user: str) -> dict:
+        return {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "user": user or "anonymous",
+            "op": op,
+            "kind": kind,
+            "id": item_id,
+            "data": data,
+        }
+
+    def _append(self, entries: list, compact: bool = True) -> None:
+        """Write entries to the log in one append + fsync and apply them; call with the lock held."""
+        lines = [(json.dumps(entry, default=str) + "\n").encode("utf-8") for entry in entries]
+        with open(self.log_path, "ab") as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        for entry, line in zip(entries, lines):
+            self._apply(entry)
+            self._log_offset += len(line)
+            self._changes.append((self._log_offset, entry))
+        self._log_entries += len(entries)
+        if compact and self._log_entries >= self.compact_every:
+            self.compact()
+
+    def _write(self, op: str, kind: str, item_id: int = None, data: dict = None, user: str = None) -> dict:
+        with self.locked():
+            self._catch_up_for_write()
+            if op == "add":
+                item_id = self._max_id[kind] + 1
+                data = {**data, "id": item_id}
+            elif item_id not in self._items[kind]:
+                raise KeyError(f"No {kind} entry with id {item_id}")
+            elif op == "delete":
+                data = self._items[kind][item_id]  # keep what was deleted in the audit trail
+            self._append([self._entry(op, kind, item_id, data, user)])
+            return self._items[kind].get(item_id, data)
+
+    def _add_many(self, kind: str, items: list, user: str = None, compact: bool = True) -> list:
+        with self.locked():
+            self._catch_up_for_write()
+            first_id = self._max_id[kind] + 1
+            entries = [
+                self._entry("add", kind, first_id + i, {**item, "id": first_id + i}, user)
+                for i, item in enumerate(items)
+            ]
+            self._append(entries, compact)
+            return [entry["data"] for entry in entries]
+
+    def add_store(self, store: dict, user: str = None) -> dict:
+        """Save a new store; returns it with its allocated id."""
+        return self._write("add", STORES, data=store, user=user)
+
+    def add_record(self, record: dict, user: str = None) -> dict:
+        """Save a new compliance record; returns it with its allocated id."""
+        return self._write("add", RECORDS, data=record, user=user)
+
+    def add_stores(self, stores: list, user: str = None, compact: bool = True) -> list:
+        """
+        Save many new stores with one log append; returns them with their ids.
+        compact=False skips the automatic compaction, for callers that
+        append several batches and call compact() once at the end.
+        """
+        return self._add_many(STORES, stores, user, compact)
+
+    def add_records(self, records: list, user: str = None, compact: bool = True) -> list:
+        """Save many new compliance records with one log append (see add_stores)."""
+        return self._add_many(RECORDS, records, user, compact)
+
+    def update_record(self, record_id: int, changes: dict, user: str = None) -> dict:
+        return self._write("update", RECORDS, item_id=record_id, data=changes, user=user)
+
+    def delete_store(self, store_id: int, user: str = None) -> None:
+        self._write("delete", STORES, item_id=store_id, user=user)
+
+    def compact(self) -> None:
+        """Fold changes.log into the snapshot files and move its lines to audit.log."""
+        with self.locked():
+            self._refresh()
+            if self._log_offset == 0:
+                return
+            # Snapshot first: if we crash before the log is cleared, replaying
+            # it over the new snapshot gives the same data
+            for kind, path in self.paths.items():
+                write_json_atomic(path, list(self._items[kind].values()))
+            write_json_atomic(self.ids_path, self._max_id)
+            with open(self.log_path, "rb") as f:
+                applied = f.read(self._log_offset)
+            with open(self.audit_path, "ab") as f:
+                f.write(applied)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.log_path, "wb") as f:
+                os.fsync(f.fileno())
+            self._reload_snapshot(tuple(_signature(path) for path in (*self.paths.values(), self.ids_path)))
+
+    # -- audit ---------------------------------------------------------------
+
+    def history(self, kind: str = None, item_id: int = None, limit: int = 100) -> list:
+        """Most recent changes first, optionally for one kind / item."""
+        entries = []
+        for path in (self.audit_path, self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    entry = json.loads(line)
+                    if (kind is None or entry["kind"] == kind) and (item_id is None or entry["id"] == item_id):
+                        entries.append(entry)
+        return entries[::-1][:limit]
@@ -0,0 +1,139 @@
+"""
+Bulk CSV import of stores and compliance records for the Waterfront tracker.
+
+The CSV is read one row at a time; valid rows are saved in batches of
+batch_size, each batch as one append to the change log, which is folded
+into the snapshot once at the end. Invalid rows are reported with their
+line number instead of stopping the import.
+
+Columns (header row required, extra columns ignored):
+    stores   name*, category, location, manager, phone
+    records  store_id* (or store* by name), category*, status*,
+             date*, next_review* (YYYY-MM-DD), inspector*, notes
+
+    python compliance_import.py records inspections.csv [--data-dir .]
+"""
+import argparse
+import time
+from datetime import date, datetime
+
+from compliance_data import ComplianceData
+from compliance_files import import_rows  # shared, via compliance_data
+from compliance_reports import STATUSES
+
+BATCH_SIZE = 5000
+
+
+def _text(row: dict, field: str, required: bool = False) -> str:
+    value = (row.get(field) or "").strip()
+    if required and not value:
+        raise ValueError(f"{field} is required")
+    return value
+
+
+def _date(row: dict, field: str) -> str:
+    value = _text(row, field, required=True)
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"{field} '{value}' is not a YYYY-MM-DD date")
+
+
+def store_validator():
+    def validate(row: dict) -> dict:
+        return {
+            "name": _text(row, "name", required=True),
+            "category": _text(row, "category") or "Other",
+            "location": _text(row, "location"),
+            "manager": _text(row, "manager"),
+            "phone": _text(row, "phone"),
+            "added_date": datetime.now().isoformat(),
+        }
+    return validate
+
+
+def record_validator(stores: list, categories: list = None):
+    """categories: allowed names, or None to accept any."""
+    store_ids = {s["id"] for s in stores}
+    names = {}
+    for s in stores:
+        names.setdefault(s["name"], []).append(s["id"])
+
+    def validate(row: dict) -> dict:
+        store_id = _text(row, "store_id")
+        if store_id:
+            if not store_id.isdigit() or int(store_id) not in store_ids:
+                raise ValueError(f"unknown store_id '{store_id}'")
+            store_id = int(store_id)
+        elif _text(row, "store"):
+            name = _text(row, "store")
+            matches = names.get(name, [])
+            if len(matches) != 1:
+                raise ValueError(f"store '{name}' " + ("matches several stores" if matches else "not found"))
+            store_id = matches[0]
+        else:
+            raise ValueError("store_id or store is required")
+        category = _text(row, "category", required=True)
+        if categories is not None and category not in categories:
+            raise ValueError(f"unknown category '{category}'")
+        status = _text(row, "status")
+        if status not in STATUSES:
+            raise ValueError(f"status '{status}' is not one of {', '.join(STATUSES)}")
+        return {
+            "store_id": store_id,
+            "category": category,
+            "status": status,
+            "date": _date(row, "date"),
+            "next_review": _date(row, "next_review"),
+            "inspector": _text(row, "inspector", required=True),
+            "notes": _text(row, "notes"),
+            "logged_at": datetime.now().isoformat(),
+        }
+    return validate
+
+
+def import_csv(data: ComplianceData, kind: str, f, categories: list = None, batch_size: int = BATCH_SIZE,
+               user: str = None, progress=None) -> dict:
+    """
+    Import stores or records from an open text file.
+
+    Args:
+        kind: "stores" or "records"
+        progress: optional callback(rows read so far), called per batch
+    Returns: {"imported": n, "failed": n, "errors": [(line, message)]}
+    """
+    if kind == "stores":
+        validate, write = store_validator(), data.add_stores
+    elif kind == "records":
+        validate, write = record_validator(data.load()[0], categories), data.add_records
+    else:
+        raise ValueError(f"Unknown import kind '{kind}' (use stores or records)")
+    # Batches go to the change log; it is folded into the snapshot once at the end
+    result = import_rows(f, validate, lambda batch: len(write(batch, user=user, compact=False)), batch_size, progress)
+    data.compact()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import stores or compliance records from CSV.")
+    parser.add_argument("kind", choices=["stores", "records"])
+    parser.add_argument("csv_file")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--user", default="csv import")
+    args = parser.parse_args()
+
+    data = ComplianceData(args.data_dir)
+    start = time.perf_counter()
+    with open(args.csv_file, newline="", encoding="utf-8-sig") as f:
+        result = import_csv(data, args.kind, f, batch_size=args.batch_size, user=args.user,
+                            progress=lambda rows: print(f"  {rows:,} rows read", end="\r"))
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"✅ Imported {result['imported']:,} {args.kind} in {elapsed:.1f}s; {result['failed']:,} rows rejected")
+    for line, message in result["errors"]:
+        print(f"  line {line}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+In-memory lookup tables over the compliance tracker's stores and records.
+
+One index is shared by every page and session. sync() brings it up to
+date with ComplianceData: new stores and records are added in place, and
+only rarer updates, deletes or a compaction by another process trigger a
+full rebuild. Resolving a record's store or a store's records is a dict
+lookup, and the latest N checks come from date-ordered lists kept sorted
+on insert instead of sorting the whole history.
+
+query() filters by store, category, status and date range with one bitmap
+per field value (a Python int, bit i set for record i): combining filters
+is a bitwise AND, and the hit count for every dropdown value is a popcount.
+Monthly status counts are kept in ComplianceRollups alongside.
+
+Review due dates (next_review) are kept sorted the same way, per scope, so
+"due in the next N days", the overdue count and a weekly forecast are
+bisects instead of a scan over every record.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from compliance_rollups import ComplianceRollups
+
+# Record fields with a bitmap per value
+FILTER_FIELDS = ("store_id", "category", "status")
+
+
+def _recency_key(record: dict, position: int) -> tuple:
+    # ISO dates sort as text; logged_at breaks ties between same-day checks
+    return record.get("date") or "", record.get("logged_at") or "", position
+
+
+def _bitmap(positions) -> int:
+    bits = bytearray(max(positions, default=-1) // 8 + 1)
+    for p in positions:
+        bits[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(bits, "little")
+
+
+# byte value -> offsets of its set bits
+_BYTE_BITS = [tuple(i for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+def _positions(bitmap: int) -> list:
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    return [n * 8 + i for n, byte in enumerate(data) if byte for i in _BYTE_BITS[byte]]
+
+
+try:
+    _count = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _count(bitmap: int) -> int:
+        return bin(bitmap).count("1")
+
+
+class ComplianceIndex:
+    def __init__(self, stores: list = (), records: list = (), version=None):
+        self._lock = threading.RLock()
+        self.version = version
+        self.stores = list(stores)
+        self.records = []
+        self.store_by_id = {s["id"]: s for s in self.stores}
+        # store id / category -> positions in self.records, in record order
+        self.positions_by_store = defaultdict(list)
+        self.positions_by_category = defaultdict(list)
+        self.status_counts = Counter()
+        self.status_counts_by_store = defaultdict(Counter)
+        # scope -> [(date, logged_at, position)] oldest first.
+        # Scopes: None (all), ("store", id), ("category", name)
+        self._recency = defaultdict(list)
+        # scope -> [(next_review, position)] soonest first, same scopes
+        self._due = defaultdict(list)
+        self.rollups = ComplianceRollups()
+        # field -> {value: bitmap of record positions}
+        self.bitmaps = {field: {} for field in FILTER_FIELDS}
+        positions = {field: defaultdict(list) for field in FILTER_FIELDS}
+        for record in records:
+            for field in FILTER_FIELDS:
+                positions[field][record.get(field)].append(len(self.records))
+            self._add_record(record, incremental=False)
+        for keys in self._recency.values():
+            keys.sort()
+        for keys in self._due.values():
+            keys.sort()
+        for field in FILTER_FIELDS:
+            self.bitmaps[field] = {value: _bitmap(p) for value, p in positions[field].items()}
+
+    def _add_record(self, record: dict, incremental: bool = True) -> None:
+        position = len(self.records)
+        self.records.append(record)
+        status = record.get("status", "Unknown")
+        self.positions_by_store[record["store_id"]].append(position)
+        self.positions_by_category[record["category"]].append(position)
+        self.status_counts[status] += 1
+        self.status_counts_by_store[record["store_id"]][status] += 1
+        self.rollups.add(record)
+        key = _recency_key(record, position)
+        # ISO dates sort as text; records without a review date are never due
+        due = record.get("next_review")
+        due_key = (due, position) if isinstance(due, str) and due else None
+        for scope in (None, ("store", record["store_id"]), ("category", record["category"])):
+            if incremental:
+                insort(self._recency[scope], key)
+                if due_key:
+                    insort(self._due[scope], due_key)
+            else:
+                self._recency[scope].append(key)
+                if due_key:
+                    self._due[scope].append(due_key)
+        if incremental:
+            for field in FILTER_FIELDS:
+                value = record.get(field)
+                self.bitmaps[field][value] = self.bitmaps[field].get(value, 0) | (1 << position)
+
+    def sync(self, data) -> "ComplianceIndex":
+        """Catch up with a ComplianceData instance; returns self."""
+        with self._lock:
+            version, changes = data.changes_since(self.version)
+            if version == self.version:
+                return self
+            if changes is None or any(c["op"] != "add" for c in changes):
+                # Build aside and swap in, so readers never see a half-built index
+                fresh = ComplianceIndex(*data.load(), version)
+                vars(self).update({k: v for k, v in vars(fresh).items() if k != "_lock"})
+                return self
+            for change in changes:
+                if change["kind"] == "stores":
+                    # Rebind rather than append so readers iterating the old list are unaffected
+                    self.stores = self.stores + [change["data"]]
+                    self.store_by_id[change["id"]] = change["data"]
+                else:
+                    self._add_record(change["data"])
+            self.version = version
+            return self
+
+    def store_name(self, store_id, default: str = "Unknown") -> str:
+        store = self.store_by_id.get(store_id)
+        return store["name"] if store else default
+
+    def store_records(self, store_id) -> list:
+        return [self.records[p] for p in self.positions_by_store.get(store_id, [])]
+
+    def category_records(self, category: str) -> list:
+        return [self.records[p] for p in self.positions_by_category.get(category, [])]
+
+    def store_status_counts(self, store_id) -> Counter:
+        return self.status_counts_by_store.get(store_id, Counter())
+
+    def latest(self, n: int = 10, store_id=None, category: str = None) -> list:
+        """The n most recent checks (by date), newest first, optionally for one store and/or category."""
+        with self._lock:
+            scopes = [("store", store_id)] if store_id is not None else []
+            scopes += [("category", category)] if category is not None else []
+            # Walk the shorter list back from the newest end, checking the other filter
+            keys = min((self._recency.get(scope, []) for scope in scopes), key=len) if scopes else self._recency.get(None, [])
+            latest = []
+            for _, _, position in reversed(keys):
+                record = self.records[position]
+                if (store_id is None or record["store_id"] == store_id) and (category is None or record["category"] == category):
+                    latest.append(record)
+                    if len(latest) == n:
+                        break
+            return latest
+
+    def _due_range(self, start: str = None, end: str = None, store_id=None, category: str = None) -> list:
+        """(next_review, position) keys due from start to end (inclusive, either open), soonest first."""
+        scopes = [("store", store_id)] if store_id is not None else []
+        scopes += [("category", category)] if category is not None else []
+        keys = min((self._due.get(scope, []) for scope in scopes), key=len) if scopes else self._due.get(None, [])
+        lo = bisect_left(keys, (start,)) if start else 0
+        hi = bisect_right(keys, (end, float("inf"))) if end else len(keys)
+        if len(scopes) < 2:
+            return keys[lo:hi]
+        # Filtered on the shorter list; check the other scope per record
+        return [(due, p) for due, p in keys[lo:hi]
+                if self.records[p]["store_id"] == store_id and self.records[p]["category"] == category]
+
+    def due_within(self, days: int, today, store_id=None, category: str = None) -> list:
+        """Records with a review due in the next `days` days (today included), soonest first."""
+        with self._lock:
+            keys = self._due_range(today.isoformat(), (today + timedelta(days=days)).isoformat(), store_id, category)
+            return [self.records[p] for _, p in keys]
+
+    def overdue(self, today, store_id=None, category: str = None) -> int:
+        """How many records have a review date before today."""
+        with self._lock:
+            return len(self._due_range(end=(today - timedelta(days=1)).isoformat(), store_id=store_id, category=category))
+
+    def weekly_forecast(self, today, weeks: int = 12, store_id=None, category: str = None) -> list:
+        """[(week start, reviews due that week)] for `weeks` weeks from this Monday."""
+        monday = today - timedelta(days=today.weekday())
+        with self._lock:
+            keys = self._due_range(monday.isoformat(), (monday + timedelta(weeks=weeks, days=-1)).isoformat(),
+                                   store_id, category)
+        dues = [due for due, _ in keys]
+        bounds = [bisect_left(dues, (monday + timedelta(weeks=i)).isoformat()) for i in range(weeks + 1)]
+        return [(monday + timedelta(weeks=i), bounds[i + 1] - bounds[i]) for i in range(weeks)]
+
+    def date_bounds(self) -> tuple:
+        """(earliest, latest) check date, or (None, None) with no records."""
+        keys = self._recency.get(None, [])
+        return (keys[0][0], keys[-1][0]) if keys else (None, None)
+
+    def _date_bitmap(self, date_from: str = None, date_to: str = None) -> int:
+        keys = self._recency.get(None, [])
+        lo = bisect_left(keys, (date_from,)) if date_from else 0
+        hi = bisect_right(keys, (date_to, chr(0x10FFFF))) if date_to else len(keys)
+        return _bitmap([position for _, _, position in keys[lo:hi]])
+
+    def query(self, store_id=None, category: str = None, status: str = None,
+              date_from: str = None, date_to: str = None) -> tuple:
+        """
+        Records matching every given filter (None = any), in record order,
+        plus facet counts {field: {value: hits}}. Each field's counts apply
+        all the other filters, i.e. what picking that value would return;
+        the None entry is the count for "any value".
+        """
+        with self._lock:
+            everything = base = (1 << len(self.records)) - 1
+            if date_from or date_to:
+                base = self._date_bitmap(date_from, date_to)
+            selected = {"store_id": store_id, "category": category, "status": status}
+            masks = {field: self.bitmaps[field].get(value, 0) for field, value in selected.items() if value is not None}
+
+            facets = {}
+            for field in FILTER_FIELDS:
+                others = base
+                for other, mask in masks.items():
+                    if other != field:
+                        others &= mask
+                facets[field] = {value: _count(bitmap & others) for value, bitmap in self.bitmaps[field].items()}
+                facets[field][None] = _count(others)
+
+            matches = base
+            for mask in masks.values():
+                matches &= mask
+            if matches == everything:
+                return list(self.records), facets
+            return [self.records[p] for p in _positions(matches)], facets
@@ -0,0 +1,68 @@
+"""
+Reports page tables, computed column-wise with pandas.
+
+build_reports() loads the records into one DataFrame and answers each
+table with a groupby / crosstab instead of Python loops over records, so
+the app can cache the result per data version and re-renders do no work.
+"""
+import pandas as pd
+
+STATUSES = ["Passed", "Failed", "Needs Review", "Not Applicable"]
+
+
+def records_frame(stores: list, records: list) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(
+        records, columns=["store_id", "category", "status"]
+    )
+    store_names = pd.Series({s["id"]: s["name"] for s in stores}, dtype=object)
+    # Stores keep their own order in the tables; other columns sort by value.
+    # Records of deleted stores get no store (NaN), so per-store tables skip them
+    frame["store"] = pd.Categorical(frame["store_id"].map(store_names), categories=pd.unique(store_names))
+    frame["status"] = frame["status"].fillna("Unknown")
+    for column in ("category", "status"):
+        frame[column] = frame[column].astype("category")
+    return frame
+
+
+def status_counts_by(frame: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Rows per value of column, one count column per status (known statuses first)."""
+    counts = pd.crosstab(frame[column], frame["status"])
+    counts.columns = counts.columns.astype(str)
+    extra = [s for s in counts.columns if s not in STATUSES]
+    return counts.reindex(columns=STATUSES + extra, fill_value=0).rename_axis(index=None, columns=None)
+
+
+def store_summary(frame: pd.DataFrame) -> pd.DataFrame:
+    counts = status_counts_by(frame, "store")
+    summary = counts[["Passed", "Failed", "Needs Review"]].copy()
+    summary["Total"] = counts.sum(axis=1)
+    summary["Compliance %"] = (counts["Passed"] / summary["Total"] * 100).round(1)
+    summary.insert(0, "Status", pd.cut(
+        summary["Compliance %"], [-1, 60, 80, 101], right=False,
+        labels=["🔴 Needs Attention", "🟡 Good", "🟢 Excellent"]
+    ).astype(str))
+    return summary[summary["Total"] > 0]
+
+
+def upcoming_reviews(records: list, today, store_name) -> pd.DataFrame:
+    """Priority table for records already picked and ordered by ComplianceIndex.due_within()."""
+    due = pd.to_datetime(pd.Series([r["next_review"] for r in records], dtype=object), errors="coerce")
+    days_until = (due - pd.Timestamp(today)).dt.days.fillna(0).astype(int)
+    return pd.DataFrame({
+        "Priority": pd.cut(days_until, [-1, 7, 14, float("inf")], labels=["🔴 URGENT", "🟡 SOON", "🟢 UPCOMING"]).astype(str),
+        "Store": [store_name(r["store_id"]) for r in records],
+        "Category": [str(r["category"]) for r in records],
+        "Due Date": [r["next_review"] for r in records],
+        "Days Until": days_until,
+    })
+
+
+def build_reports(stores: list, records: list) -> dict:
+    """Every Reports page table that depends only on the data (not on today's date)."""
+    frame = records_frame(stores, records)
+    return {
+        "frame": frame,
+        # statuses as rows, categories as columns, as the bar chart expects
+        "by_category": status_counts_by(frame, "category").T,
+        "by_store": store_summary(frame),
+    }
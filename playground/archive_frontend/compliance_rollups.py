@@ -0,0 +1,68 @@
+"""
+Monthly compliance rollups.
+
+Counts of checks per month (of the check date) and status, overall, per
+store and per category, updated one record at a time as checks are
+added. Trend charts and "worst stores this quarter" read a few dozen
+counters instead of scanning the records.
+"""
+import threading
+from collections import Counter, defaultdict
+from datetime import date
+
+
+def quarter_months(day: date = None) -> tuple:
+    """(first month, last month) of day's quarter, as YYYY-MM."""
+    day = day or date.today()
+    first = (day.month - 1) // 3 * 3 + 1
+    return f"{day.year}-{first:02d}", f"{day.year}-{first + 2:02d}"
+
+
+class ComplianceRollups:
+    def __init__(self, records=()):
+        self._lock = threading.Lock()
+        # scope -> month -> Counter(status).
+        # Scopes: None (all), ("store", id), ("category", name)
+        self._counts = defaultdict(lambda: defaultdict(Counter))
+        for record in records:
+            self.add(record)
+
+    def add(self, record: dict) -> None:
+        month = (record.get("date") or "")[:7]
+        if not month:
+            return
+        status = record.get("status", "Unknown")
+        with self._lock:
+            for scope in (None, ("store", record["store_id"]), ("category", record["category"])):
+                self._counts[scope][month][status] += 1
+
+    def trend(self, scope: tuple = None) -> list:
+        """[(month, Counter(status))] oldest first."""
+        with self._lock:
+            months = self._counts.get(scope, {})
+            return [(month, Counter(months[month])) for month in sorted(months)]
+
+    def totals(self, scope: tuple = None, start: str = None, end: str = None) -> Counter:
+        """Status counts for months start..end (YYYY-MM, inclusive, either open)."""
+        total = Counter()
+        with self._lock:
+            for month, counts in self._counts.get(scope, {}).items():
+                if (start is None or month >= start) and (end is None or month <= end):
+                    total.update(counts)
+        return total
+
+    def worst_stores(self, start: str = None, end: str = None, limit: int = 10, min_checks: int = 1) -> list:
+        """
+        Stores with the lowest pass rate over months start..end:
+        [(store id, pass rate %, Counter(status))], worst first.
+        """
+        with self._lock:
+            store_ids = [scope[1] for scope in self._counts if scope is not None and scope[0] == "store"]
+        ranking = []
+        for store_id in store_ids:
+            counts = self.totals(("store", store_id), start, end)
+            checks = sum(counts.values())
+            if checks >= min_checks:
+                ranking.append((store_id, counts["Passed"] / checks * 100, counts))
+        ranking.sort(key=lambda row: (row[1], -sum(row[2].values())))
+        return ranking[:limit]
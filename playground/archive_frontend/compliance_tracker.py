@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+import io
 import os
-import json
+import tempfile
+
+from compliance_data import ComplianceData
+from compliance_index import ComplianceIndex
+from compliance_reports import STATUSES, build_reports, upcoming_reviews
+from compliance_rollups import quarter_months
+from compliance_export import FORMATS, available_formats, export_chunks  # shared, via compliance_data
+from compliance_import import import_csv
 
 st.set_page_config(
     page_title="Waterfront Mall Compliance Tracker",
@@ -171,25 +179,30 @@ if "stores" not in st.session_state:
 if "compliance_records" not in st.session_state:
     st.session_state.compliance_records = []
 
-# Data file paths
-STORES_FILE = "stores.json"
-COMPLIANCE_FILE = "compliance_records.json"
+# Data files (stores.json, compliance_records.json, changes.log) in the working directory.
+# Writes go through ComplianceData so concurrent sessions can't overwrite each other.
+# One instance per server, so each rerun only reads changes it hasn't seen yet.
+@st.cache_resource
+def get_data():
+    return ComplianceData(".")
+
+data = get_data()
+
+# Lookup tables shared by every page and session; sync() applies only new changes
+@st.cache_resource
+def get_index():
+    return ComplianceIndex()
+
+# Reports page tables, computed once per data version
+@st.cache_resource(max_entries=1)
+def get_reports(version, _index):
+    return build_reports(list(_index.stores), list(_index.records))
 
 # Load existing data
 def load_data():
-    if os.path.exists(STORES_FILE):
-        with open(STORES_FILE, "r") as f:
-            st.session_state.stores = json.load(f)
-    if os.path.exists(COMPLIANCE_FILE):
-        with open(COMPLIANCE_FILE, "r") as f:
-            st.session_state.compliance_records = json.load(f)
-
-# Save data
-def save_data():
-    with open(STORES_FILE, "w") as f:
-        json.dump(st.session_state.stores, f, indent=2, default=str)
-    with open(COMPLIANCE_FILE, "w") as f:
-        json.dump(st.session_state.compliance_records, f, indent=2, default=str)
+    st.session_state.index = get_index().sync(data)
+    st.session_state.stores = st.session_state.index.stores
+    st.session_state.compliance_records = st.session_state.index.records
 
 # Compliance categories
 COMPLIANCE_CATEGORIES = [
@@ -204,8 +217,21 @@ COMPLIANCE_CATEGORIES = [
     "Store Front"
 ]
 
+# Export columns: (record field, header)
+EXPORT_COLUMNS = [
+    ("date", "Date"),
+    ("store_name", "Store"),
+    ("category", "Category"),
+    ("status", "Status"),
+    ("inspector", "Inspector"),
+    ("next_review", "Next Review"),
+    ("notes", "Notes")
+]
+EXPORT_CHUNK_SIZE = 10000
+
 # Load data on app start
 load_data()
+index = st.session_state.index
 
 # Professional header with Waterfront Cape Town logo
 import os
@@ -228,9 +254,35 @@ with col_title:
 
 st.markdown("---")
 
+def bulk_import_section(kind):
+    """CSV upload for stores or compliance records, shown on the page that adds them."""
+    with st.expander(f"📤 Bulk import {'stores' if kind == 'stores' else 'compliance records'} from CSV"):
+        if kind == "stores":
+            st.caption("Columns: name, category, location, manager, phone")
+        else:
+            st.caption("Columns: store_id (or store name), category, status, date, next_review (YYYY-MM-DD), inspector, notes")
+        upload = st.file_uploader("CSV file", type=["csv"], key=f"import_{kind}_file")
+        if upload is not None and st.button("📤 Import", key=f"import_{kind}_btn"):
+            progress_bar = st.progress(0.0, text="Importing...")
+            result = import_csv(
+                data, kind, io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""),
+                categories=COMPLIANCE_CATEGORIES if kind == "records" else None, user=current_user,
+                progress=lambda rows: progress_bar.progress(
+                    min(upload.tell() / max(upload.size, 1), 1.0), text=f"Read {rows:,} rows")
+            )
+            progress_bar.empty()
+            st.success(f"✅ Imported {result['imported']:,} {kind}")
+            if result["failed"]:
+                st.warning(f"⚠️ {result['failed']:,} rows rejected")
+                st.dataframe(pd.DataFrame(result["errors"], columns=["Line", "Error"]),
+                             use_container_width=True, hide_index=True)
+
 # Sidebar navigation
 page = st.sidebar.radio("Navigation", 
-    ["📊 Dashboard", "🏪 Manage Stores", "✅ Log Compliance", "📋 View Records", "📈 Reports"])
+    ["📊 Dashboard", "🏪 Manage Stores", "✅ Log Compliance", "📋 View Records", "📈 Reports", "🕘 Audit Trail"])
+
+# Recorded against every change in the audit trail
+current_user = st.sidebar.text_input("Your name", key="current_user").strip() or None
 
 # ==================== DASHBOARD ====================
 if page == "📊 Dashboard":
@@ -246,8 +298,8 @@ if page == "📊 Dashboard":
         total_checks = len(st.session_state.compliance_records)
         
         # Calculate compliance status
-        passed = len([r for r in st.session_state.compliance_records if r["status"] == "Passed"])
-        failed = len([r for r in st.session_state.compliance_records if r["status"] == "Failed"])
+        passed = index.status_counts["Passed"]
+        failed = index.status_counts["Failed"]
         
         col1.metric("📍 Total Stores", total_stores, help="Number of registered stores")
         col2.metric("✅ Total Checks", total_checks, help="Total compliance checks performed")
@@ -261,10 +313,10 @@ if page == "📊 Dashboard":
         
         store_status = []
         for store in st.session_state.stores:
-            store_records = [r for r in st.session_state.compliance_records if r["store_id"] == store["id"]]
-            if store_records:
-                passed_count = len([r for r in store_records if r["status"] == "Passed"])
-                total_count = len(store_records)
+            store_counts = index.store_status_counts(store["id"])
+            if store_counts:
+                passed_count = store_counts["Passed"]
+                total_count = sum(store_counts.values())
                 completion_rate = (passed_count / total_count * 100) if total_count > 0 else 0
             else:
                 completion_rate = 0
@@ -297,12 +349,18 @@ if page == "📊 Dashboard":
         # Recent compliance checks
         st.markdown('<div class="section-title">Recent Compliance Checks</div>', unsafe_allow_html=True)
         if st.session_state.compliance_records:
-            recent_records = sorted(st.session_state.compliance_records, 
-                                  key=lambda x: x["date"], reverse=True)[:10]
+            col_store, col_category = st.columns(2)
+            with col_store:
+                recent_store = st.selectbox("Store", [None] + list(index.store_by_id),
+                    format_func=lambda x: "All" if x is None else index.store_name(x), key="recent_store")
+            with col_category:
+                recent_category = st.selectbox("Category", [None] + COMPLIANCE_CATEGORIES,
+                    format_func=lambda x: "All" if x is None else x, key="recent_category")
+            recent_records = index.latest(10, store_id=recent_store, category=recent_category)
             
             recent_df_data = []
             for record in recent_records:
-                store_name = next((s["name"] for s in st.session_state.stores if s["id"] == record["store_id"]), "Unknown")
+                store_name = index.store_name(record["store_id"])
                 status_emoji = "✅" if record["status"] == "Passed" else "❌" if record["status"] == "Failed" else "⚠️"
                 recent_df_data.append({
                     "": status_emoji,
@@ -338,7 +396,6 @@ elif page == "🏪 Manage Stores":
             if st.button("✅ Add Store", key="add_store_btn", use_container_width=True):
                 if store_name:
                     new_store = {
-                        "id": len(st.session_state.stores) + 1,
                         "name": store_name,
                         "category": store_category,
                         "location": store_location,
@@ -346,8 +403,7 @@ elif page == "🏪 Manage Stores":
                         "phone": store_phone,
                         "added_date": datetime.now().isoformat()
                     }
-                    st.session_state.stores.append(new_store)
-                    save_data()
+                    data.add_store(new_store, user=current_user)
                     st.success(f"✅ Store '{store_name}' added successfully!")
                     st.rerun()
                 else:
@@ -357,6 +413,8 @@ elif page == "🏪 Manage Stores":
     with col2:
         st.write("")  # Spacing
     
+    bulk_import_section("stores")
+    
     st.markdown("---")
     
     st.markdown('<div class="section-title">📋 Existing Stores</div>', unsafe_allow_html=True)
@@ -369,13 +427,13 @@ elif page == "🏪 Manage Stores":
         st.markdown('<div class="section-title">🗑️ Delete Store</div>', unsafe_allow_html=True)
         col_select, col_btn = st.columns([3, 1])
         with col_select:
+            store_names = {s["id"]: s["name"] for s in st.session_state.stores}
             store_to_delete = st.selectbox("Select store to delete", 
-                [s["name"] for s in st.session_state.stores], key="delete_select")
+                list(store_names), format_func=store_names.get, key="delete_select")
         with col_btn:
             if st.button("🗑️ Delete", key="delete_store_btn", use_container_width=True):
-                st.session_state.stores = [s for s in st.session_state.stores if s["name"] != store_to_delete]
-                save_data()
-                st.success(f"✅ Store '{store_to_delete}' deleted!")
+                data.delete_store(store_to_delete, user=current_user)
+                st.success(f"✅ Store '{store_names[store_to_delete]}' deleted!")
                 st.rerun()
     else:
         st.info("ℹ️ No stores added yet.")
@@ -420,7 +478,6 @@ elif page == "✅ Log Compliance":
                     # Extract status properly - remove emoji and trim whitespace
                     status_clean = compliance_status.split(" ", 1)[1] if " " in compliance_status else compliance_status
                     new_record = {
-                        "id": len(st.session_state.compliance_records) + 1,
                         "store_id": store_id,
                         "category": compliance_category,
                         "status": status_clean,
@@ -430,14 +487,15 @@ elif page == "✅ Log Compliance":
                         "notes": compliance_notes,
                         "logged_at": datetime.now().isoformat()
                     }
-                    st.session_state.compliance_records.append(new_record)
-                    save_data()
+                    data.add_record(new_record, user=current_user)
                     st.success(f"✅ Compliance record for '{selected_store}' saved successfully!")
                     st.rerun()
                 else:
                     st.error("❌ Please enter inspector name")
         
         st.markdown("</div>", unsafe_allow_html=True)
+        
+        bulk_import_section("records")
 
 # ==================== VIEW RECORDS ====================
 elif page == "📋 View Records":
@@ -446,42 +504,55 @@ elif page == "📋 View Records":
     if not st.session_state.compliance_records:
         st.info("ℹ️ No compliance records yet.")
     else:
-        # Filters
+        # Filters. The query runs on the selections from session state first,
+        # so every dropdown option can show how many records it would match.
+        filter_store = st.session_state.get("view_filter_store")
+        filter_category = st.session_state.get("view_filter_category")
+        filter_status = st.session_state.get("view_filter_status")
+        date_range = st.session_state.get("view_date_range") if st.session_state.get("view_filter_dates") else None
+        if date_range and len(date_range) == 2:
+            date_from, date_to = (d.isoformat() for d in date_range)
+        else:
+            date_from = date_to = None
+        filtered_records, facets = index.query(filter_store, filter_category, filter_status, date_from, date_to)
+        
+        def facet_label(field, name=None):
+            return lambda value: f"{'All' if value is None else (name or str)(value)} ({facets[field].get(value, 0):,})"
+        
         st.markdown("#### 🔍 Filter Records")
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            filter_store = st.selectbox("Filter by Store", 
-                ["All"] + [s["name"] for s in st.session_state.stores], key="view_filter_store")
+            st.selectbox("Filter by Store", 
+                [None] + list(index.store_by_id), format_func=facet_label("store_id", index.store_name),
+                key="view_filter_store")
         
         with col2:
-            filter_category = st.selectbox("Filter by Category", 
-                ["All"] + COMPLIANCE_CATEGORIES, key="view_filter_category")
+            st.selectbox("Filter by Category", 
+                [None] + COMPLIANCE_CATEGORIES, format_func=facet_label("category"), key="view_filter_category")
         
         with col3:
-            filter_status = st.selectbox("Filter by Status", 
-                ["All", "Passed", "Failed", "Needs Review", "Not Applicable"], key="view_filter_status")
-        
+            st.selectbox("Filter by Status", 
+                [None, "Passed", "Failed", "Needs Review", "Not Applicable"], format_func=facet_label("status"),
+                key="view_filter_status")
+        
+        col_dates, col_range = st.columns([1, 2])
+        with col_dates:
+            st.checkbox("📅 Filter by date", key="view_filter_dates")
+        with col_range:
+            if st.session_state.get("view_filter_dates"):
+                earliest, latest = (datetime.fromisoformat(d).date() if d else datetime.now().date()
+                                    for d in index.date_bounds())
+                st.date_input("Check date range", value=(earliest, latest), key="view_date_range")
+        
+        st.caption(f"{len(filtered_records):,} matching records")
         st.markdown("---")
         
-        # Apply filters
-        filtered_records = st.session_state.compliance_records
-        
-        if filter_store != "All":
-            store_id = next(s["id"] for s in st.session_state.stores if s["name"] == filter_store)
-            filtered_records = [r for r in filtered_records if r["store_id"] == store_id]
-        
-        if filter_category != "All":
-            filtered_records = [r for r in filtered_records if r["category"] == filter_category]
-        
-        if filter_status != "All":
-            filtered_records = [r for r in filtered_records if r["status"] == filter_status]
-        
         # Display records
         if filtered_records:
             display_records = []
             for record in filtered_records:
-                store_name = next((s["name"] for s in st.session_state.stores if s["id"] == record["store_id"]), "Unknown")
+                store_name = index.store_name(record["store_id"])
                 status_emoji = "✅" if record["status"] == "Passed" else "❌" if record["status"] == "Failed" else "⚠️"
                 display_records.append({
                     "": status_emoji,
@@ -499,15 +570,38 @@ elif page == "📋 View Records":
             st.markdown("---")
             st.markdown("#### 📥 Export")
             
-            # Export option
-            csv_data = df_records.to_csv(index=False)
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv_data,
-                file_name=f"compliance_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            # Export option (written in chunks to a file, only when asked for)
+            export_format = st.selectbox("Export format", available_formats(), key="export_format")
+            if st.button("📥 Prepare export", key="prepare_export_btn"):
+                extension, mime = FORMATS[export_format]
+                def export_rows():
+                    for start in range(0, len(filtered_records), EXPORT_CHUNK_SIZE):
+                        yield [
+                            {**record, "store_name": index.store_name(record["store_id"])}
+                            for record in filtered_records[start:start + EXPORT_CHUNK_SIZE]
+                        ]
+                
+                fd, export_path = tempfile.mkstemp(prefix="compliance_records_", suffix=extension)
+                os.close(fd)
+                try:
+                    progress_bar = st.progress(0.0, text="Exporting...")
+                    export_chunks(
+                        export_rows(), EXPORT_COLUMNS, export_format, export_path,
+                        lambda done: progress_bar.progress(min(done / len(filtered_records), 1.0), text=f"Exported {done:,} of {len(filtered_records):,} records")
+                    )
+                    progress_bar.empty()
+                    
+                    # The button keeps its own copy of the file, so it can go straight away
+                    with open(export_path, "rb") as f:
+                        st.download_button(
+                            label=f"📥 Download {export_format}",
+                            data=f,
+                            file_name=f"compliance_records_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}",
+                            mime=mime,
+                            use_container_width=True
+                        )
+                finally:
+                    os.remove(export_path)
         else:
             st.info("ℹ️ No records match the selected filters.")
 
@@ -518,99 +612,129 @@ elif page == "📈 Reports":
     if not st.session_state.compliance_records:
         st.info("ℹ️ No data available for reports.")
     else:
+        reports = get_reports(index.version, index)
+        
         # Compliance by category
         st.markdown("#### 📊 Compliance Status by Category")
+        df_cat = reports["by_category"]
+        st.bar_chart(df_cat)
+        st.dataframe(df_cat, use_container_width=True)
         
-        category_stats = {}
-        for record in st.session_state.compliance_records:
-            cat = record["category"]
-            status = record.get("status", "Unknown")
-            if cat not in category_stats:
-                category_stats[cat] = {"Passed": 0, "Failed": 0, "Needs Review": 0, "Not Applicable": 0}
-            # Only add if status exists in the dictionary, otherwise skip or add to Unknown
-            if status in category_stats[cat]:
-                category_stats[cat][status] += 1
-            else:
-                # If status is not in predefined list, add it
-                if status not in category_stats[cat]:
-                    category_stats[cat][status] = 0
-                category_stats[cat][status] += 1
+        st.markdown("---")
         
-        if category_stats:
-            df_cat = pd.DataFrame(category_stats).fillna(0).astype(int)
-            st.bar_chart(df_cat)
-            st.dataframe(df_cat, use_container_width=True)
+        # Trends over time, from the monthly rollups
+        st.markdown("#### 📆 Monthly Compliance Trend")
+        
+        def trend_label(scope):
+            if scope is None:
+                return "All stores and categories"
+            return f"🏪 {index.store_name(scope[1])}" if scope[0] == "store" else f"📋 {scope[1]}"
+        
+        trend_scope = st.selectbox("Show trend for",
+            [None] + [("store", s["id"]) for s in st.session_state.stores] + [("category", c) for c in COMPLIANCE_CATEGORIES],
+            format_func=trend_label, key="trend_scope")
+        trend = index.rollups.trend(trend_scope)
+        if trend:
+            df_trend = pd.DataFrame([
+                {"Month": month, **{s: counts[s] for s in STATUSES}, "Checks": sum(counts.values()),
+                 "Pass rate %": round(counts["Passed"] / sum(counts.values()) * 100, 1)}
+                for month, counts in trend
+            ]).set_index("Month")
+            st.line_chart(df_trend["Pass rate %"])
+            st.bar_chart(df_trend[["Passed", "Failed", "Needs Review"]])
+            st.dataframe(df_trend, use_container_width=True)
+        else:
+            st.info("ℹ️ No checks recorded for this selection.")
+        
+        st.markdown("---")
+        
+        # Worst stores this quarter
+        quarter_start, quarter_end = quarter_months(datetime.now().date())
+        st.markdown(f"#### 🚨 Worst-Performing Stores This Quarter ({quarter_start} to {quarter_end})")
+        worst = index.rollups.worst_stores(quarter_start, quarter_end, limit=10)
+        if worst:
+            st.dataframe(pd.DataFrame([{
+                "Store": index.store_name(store_id),
+                "Pass rate %": round(pass_rate, 1),
+                "Passed": counts["Passed"],
+                "Failed": counts["Failed"],
+                "Needs Review": counts["Needs Review"],
+                "Checks": sum(counts.values())
+            } for store_id, pass_rate, counts in worst]), use_container_width=True, hide_index=True)
+        else:
+            st.info("ℹ️ No checks recorded this quarter yet.")
         
         st.markdown("---")
         
         # Compliance by store
         st.markdown("#### 🏪 Compliance Summary by Store")
-        
-        store_stats = {}
-        for store in st.session_state.stores:
-            store_records = [r for r in st.session_state.compliance_records if r["store_id"] == store["id"]]
-            if store_records:
-                passed = len([r for r in store_records if r["status"] == "Passed"])
-                failed = len([r for r in store_records if r["status"] == "Failed"])
-                total = len(store_records)
-                compliance_pct = round((passed / total * 100), 1) if total > 0 else 0
-                
-                # Add status indicator
-                if compliance_pct >= 80:
-                    status = "🟢 Excellent"
-                elif compliance_pct >= 60:
-                    status = "🟡 Good"
-                else:
-                    status = "🔴 Needs Attention"
-                
-                store_stats[store["name"]] = {
-                    "Status": status,
-                    "Passed": passed,
-                    "Failed": failed,
-                    "Needs Review": len([r for r in store_records if r["status"] == "Needs Review"]),
-                    "Total": total,
-                    "Compliance %": compliance_pct
-                }
-        
-        if store_stats:
-            df_store_stats = pd.DataFrame(store_stats).T
-            st.dataframe(df_store_stats, use_container_width=True)
+        st.dataframe(reports["by_store"], use_container_width=True)
         
         st.markdown("---")
         
-        # Upcoming reviews
-        st.markdown("#### 📅 Upcoming Compliance Reviews (Next 30 Days)")
+        # Upcoming reviews, from the index's due-date order
+        st.markdown("#### 📅 Upcoming Compliance Reviews")
         
         today = datetime.now().date()
-        upcoming = []
-        
-        for record in st.session_state.compliance_records:
-            next_review = datetime.fromisoformat(record["next_review"]).date()
-            days_until = (next_review - today).days
-            
-            if 0 <= days_until <= 30:
-                store_name = next((s["name"] for s in st.session_state.stores if s["id"] == record["store_id"]), "Unknown")
-                
-                if days_until <= 7:
-                    priority = "🔴 URGENT"
-                elif days_until <= 14:
-                    priority = "🟡 SOON"
-                else:
-                    priority = "🟢 UPCOMING"
-                
-                upcoming.append({
-                    "Priority": priority,
-                    "Store": store_name,
-                    "Category": record["category"],
-                    "Due Date": record["next_review"],
-                    "Days Until": days_until
-                })
-        
-        if upcoming:
-            df_upcoming = pd.DataFrame(upcoming).sort_values("Days Until")
-            st.dataframe(df_upcoming, use_container_width=True, hide_index=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            due_store = st.selectbox("Store", [None] + list(index.store_by_id),
+                format_func=lambda x: "All" if x is None else index.store_name(x), key="due_store")
+        with col2:
+            due_category = st.selectbox("Category", [None] + COMPLIANCE_CATEGORIES,
+                format_func=lambda x: "All" if x is None else x, key="due_category")
+        with col3:
+            due_days = st.selectbox("Due within", [7, 14, 30, 60, 90], index=2,
+                format_func=lambda d: f"{d} days", key="due_days")
+        
+        due_records = index.due_within(due_days, today, store_id=due_store, category=due_category)
+        overdue = index.overdue(today, store_id=due_store, category=due_category)
+        col1, col2 = st.columns(2)
+        col1.metric(f"Due in the next {due_days} days", len(due_records))
+        col2.metric("Overdue", overdue)
+        if due_records:
+            st.dataframe(upcoming_reviews(due_records, today, index.store_name), use_container_width=True, hide_index=True)
         else:
-            st.info("✅ No reviews due in the next 30 days.")
+            st.info(f"✅ No reviews due in the next {due_days} days.")
+        
+        forecast = index.weekly_forecast(today, weeks=12, store_id=due_store, category=due_category)
+        if any(count for _, count in forecast):
+            st.markdown("##### Reviews due per week (next 12 weeks)")
+            st.bar_chart(pd.DataFrame(
+                [{"Week of": week.isoformat(), "Reviews due": count} for week, count in forecast]
+            ).set_index("Week of"))
+
+# ==================== AUDIT TRAIL ====================
+elif page == "🕘 Audit Trail":
+    st.markdown('<div class="section-title">🕘 Audit Trail</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        kind_labels = {"All": None, "Stores": "stores", "Compliance Records": "compliance_records"}
+        audit_kind = st.selectbox("Show changes to", list(kind_labels), key="audit_kind")
+    with col2:
+        audit_limit = st.selectbox("Most recent", [50, 100, 500, 1000], key="audit_limit")
+    
+    history = data.history(kind=kind_labels[audit_kind], limit=audit_limit)
+    if history:
+        audit_rows = []
+        for entry in history:
+            details = entry["data"] or {}
+            if entry["kind"] == "stores":
+                item = details.get("name") or index.store_name(entry["id"], f"Store #{entry['id']}")
+            else:
+                item = f"#{entry['id']} {details.get('category', '')}".strip()
+            audit_rows.append({
+                "When": entry["at"],
+                "User": entry["user"],
+                "Action": entry["op"].title(),
+                "Type": "Store" if entry["kind"] == "stores" else "Compliance Record",
+                "Item": item,
+                "Details": ", ".join(f"{k}: {v}" for k, v in details.items() if k != "id")
+            })
+        st.dataframe(pd.DataFrame(audit_rows), use_container_width=True, hide_index=True)
+    else:
+        st.info("ℹ️ No changes recorded yet.")
 
 st.markdown("---")
 st.markdown("""